@@ -1,339 +1,700 @@
-import pygame 
-import math
-from queue import PriorityQueue, Queue
-from node import Node # Need Node class for type hinting / checks if desired
-from constants import * # Need colors, ROWS
+from constants import * # Need search events
+from open_list import make_open_list
+import heuristics
+
+UNSEEN = 2 ** 31 - 1 # "Infinite" g-cost that still fits an int32 array slot
+NO_PARENT = -1
+
+# --- Search Result ---
+class SearchResult:
+    """Outcome of a search: the path found plus counters for the run."""
+
+    def __init__(self, found, path=None, expansions=0, message="", peak_open=0, cost=None,
+                 pushes=None, bound=None, pruned=None):
+        self.found = found
+        self.path = path or []  # Cell indices from start to end, inclusive
+        self.steps = len(self.path) - 1 if self.path else None
+        # Sum of the terrain costs entered along the path (the step count on
+        # a grid without terrain)
+        self.cost = self.steps if cost is None else cost
+        self.expansions = expansions
+        self.peak_open = peak_open  # Largest frontier (open list / stack) size seen
+        self.pushes = pushes  # Cells added to the frontier, re-pushes included (None: not counted)
+        self.bound = bound  # Proven limit on cost / optimal cost (anytime searches; None: not given)
+        self.pruned = pruned  # Nodes dropped to respect a memory cap (None: search is not bounded)
+        self.message = message
+        self.elapsed = 0.0  # Filled in by solver.solve()
+        self.timed_out = False  # Set by solver.solve() when its time limit hit
+
+    def __repr__(self):
+        return (f"SearchResult(found={self.found}, cost={self.cost}, "
+                f"expansions={self.expansions}, elapsed={self.elapsed:.4f})")
+
 
 # --- Helper Functions ---
-def h(p1, p2):
-    """Heuristic function (Manhattan distance)."""
-    x1, y1 = p1
-    x2, y2 = p2
-    return abs(x1 - x2) + abs(y1 - y2)
-
-def reconstruct_path(came_from, current, draw_func, start_node):
-    """Draws the path from end to start by changing node colors."""
-    path_nodes = []
-    temp = current
-    while temp in came_from:
-        temp = came_from[temp]
-        if temp != start_node: # Don't color the start node purple
-             path_nodes.append(temp)
+def h(grid, a, b):
+    """
+    The grid's default heuristic between two cell indices: Manhattan
+    distance when 4-connected, octile distance when 8-connected.
+    """
+    if grid.connectivity == 8:
+        return heuristics.octile(grid, a, b)
+    return heuristics.manhattan(grid, a, b)
+
+def reconstruct_path(came_from, start, current):
+    """Follows the parent array back from 'current' and returns the path start -> current."""
+    path = [current]
+    while current != start:
+        current = came_from[current]
+        path.append(current)
         # Safety break
-        if len(path_nodes) > ROWS * ROWS: # Use ROWS from constants
+        if current == NO_PARENT or len(path) > len(came_from):
             print("Error: Path reconstruction exceeded maximum possible length.")
             break
+    path.reverse()
+    return path
 
-    for node in reversed(path_nodes):
-        if node != start_node:
-            node.make_path()
-            # time.sleep(0.01) # Optional delay
-            draw_func() # Call the draw function passed from visualizer
-            pygame.display.update() # Update display immediately to see path build
-
-
-# --- Algorithm Implementations ---
-# All algorithms accept 'visualizer' object to access draw, stop_requested, check_for_quit
-
-def a_star(visualizer, grid, start, end):
-    count = 0
-    open_set = PriorityQueue()
-    open_set.put((0, count, start))
-    came_from = {}
-    g_score = {node: float("inf") for row in grid for node in row}
-    g_score[start] = 0
-    f_score = {node: float("inf") for row in grid for node in row}
-    f_score[start] = h(start.get_pos(), end.get_pos())
-    open_set_hash = {start}
-
-    while not open_set.empty() and not visualizer.stop_requested:
-        visualizer.check_for_quit()
-        if visualizer.stop_requested: break
-
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
-
-        if current == end:
-            reconstruct_path(came_from, end, visualizer.draw, start)
-            if not visualizer.stop_requested:
-                end.make_end()
-                start.make_start()
-            return True
-
-        for neighbor in current.neighbors:
-            temp_g_score = g_score[current] + 1
-            if temp_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = temp_g_score
-                f_score[neighbor] = temp_g_score + h(neighbor.get_pos(), end.get_pos())
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
-                    if neighbor != end: neighbor.make_open()
-
-        visualizer.draw()
-        if current != start:
-            current.make_closed()
-
-    return False
-
-def dijkstra(visualizer, grid, start, end):
-    count = 0
-    open_set = PriorityQueue()
-    open_set.put((0, count, start)) # (distance, count, node)
-    came_from = {}
-    distance = {node: float("inf") for row in grid for node in row}
-    distance[start] = 0
-    open_set_hash = {start}
-
-    while not open_set.empty() and not visualizer.stop_requested:
-        visualizer.check_for_quit()
-        if visualizer.stop_requested: break
-
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
-
-        if current == end:
-            reconstruct_path(came_from, end, visualizer.draw, start)
-            if not visualizer.stop_requested:
-                end.make_end()
-                start.make_start()
-            return True
-
-        for neighbor in current.neighbors:
-            temp_distance = distance[current] + 1
-            if temp_distance < distance[neighbor]:
-                came_from[neighbor] = current
-                distance[neighbor] = temp_distance
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((distance[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
-                    if neighbor != end: neighbor.make_open()
-
-        visualizer.draw()
-        if current != start:
-            current.make_closed()
-
-    return False
-
-
-def bfs(visualizer, grid, start, end):
-    queue = Queue()
-    queue.put(start)
-    came_from = {}
-    visited = {start}
-
-    while not queue.empty() and not visualizer.stop_requested:
-        visualizer.check_for_quit()
-        if visualizer.stop_requested: break
-
-        current = queue.get()
-
-        if current == end:
-            reconstruct_path(came_from, end, visualizer.draw, start)
-            if not visualizer.stop_requested:
-                end.make_end()
-                start.make_start()
-            return True
-
-        for neighbor in current.neighbors:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                came_from[neighbor] = current
-                queue.put(neighbor)
-                if neighbor != end: neighbor.make_open()
-
-        visualizer.draw()
-        if current != start:
-            current.make_closed()
-
-    return False
-
-
-def dfs(visualizer, grid, start, end):
-    stack = [start]
-    came_from = {}
-    visited = {start}
+def path_cost(grid, path):
+    """Cost of a path: every cell entered after the first, diagonal moves scaled."""
+    return sum(grid.move_cost(cell, next_cell) for cell, next_cell in zip(path, path[1:]))
 
-    while stack and not visualizer.stop_requested:
-        visualizer.check_for_quit()
-        if visualizer.stop_requested: break
+def cost_order_list(grid):
+    """
+    Cheapest open list that pops cells in path-cost order on this grid: a
+    FIFO (plain BFS) for unit costs, Dial's buckets for integer terrain
+    costs, and a heap once diagonal moves make costs fractional.
+    """
+    if grid.connectivity != 4:
+        return make_open_list('heap')
+    return make_open_list('bucket' if grid.weighted else 'fifo')
 
-        current = stack.pop()
+def emit_path(path):
+    """Yields a path event for every cell between start and end."""
+    for cell in path[1:-1]:
+        yield EVENT_PATH, cell
 
-        if current != start and current != end:
-            current.make_current()
-        visualizer.draw()
-        # time.sleep(0.01)
 
-        if current == end:
-            visualizer.clear_search_visualization(clear_only_search=True, keep_current_algo_colors=True)
-            reconstruct_path(came_from, end, visualizer.draw, start)
-            if not visualizer.stop_requested:
-                end.make_end()
-                start.make_start()
-            return True
-
-        for neighbor in reversed(current.neighbors):
-            if neighbor not in visited:
-                visited.add(neighbor)
+# --- Algorithm Implementations ---
+# Every algorithm is a generator taking (grid, start, end) where grid is a
+# GridModel and start/end are cell indices. It yields (event, cell) pairs for
+# anyone who wants to watch and returns a SearchResult when it finishes.
+# Drive one with solver.solve(), or step it manually as the visualizer does.
+# Per-cell search state lives in int32 arrays indexed by cell, not dicts.
+# Moving into a cell costs grid.costs[cell] (times DIAGONAL_COST for a
+# diagonal move on an 8-connected grid); a_star, dijkstra and the
+# bidirectional A* honor it. The BFS/DFS family counts moves but reports
+# the cost of the path it finds, and JPS falls back to a_star on a weighted
+# or 8-connected grid. Open lists: 'bucket' (Dial's queue) suits the small
+# integer priorities of a_star and dijkstra on 4-connected grids.
+
+def a_star(grid, start, end, open_list='heap', tie_break='high_g', heuristic=None):
+    """A* search. 'heuristic' names one from heuristics.py (default: the grid's best)."""
+    estimate = heuristics.resolve(grid, heuristic)
+    expansions = 0
+    peak_open = 0
+    pushes = 1
+    open_set = make_open_list(open_list, tie_break)
+    open_set.push(start, estimate(grid, start, end), 0)
+
+    with grid.workspace() as work:
+        # A cell's g-score and parent are set iff stamp[cell] == generation
+        stamp, generation = work.stamp, work.generation
+        came_from, g_score = work.parent, work.cost
+        stamp[start] = generation
+        g_score[start] = 0
+
+        while open_set:
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+            current = open_set.pop()
+            expansions += 1
+
+            if current == end:
+                path = reconstruct_path(came_from, start, end)
+                yield from emit_path(path)
+                return SearchResult(True, path, expansions, peak_open=peak_open, cost=g_score[end],
+                                    pushes=pushes)
+
+            g_current = g_score[current]
+            for neighbor, step in grid.moves(current):
+                temp_g_score = g_current + step
+                if stamp[neighbor] != generation or temp_g_score < g_score[neighbor]:
+                    stamp[neighbor] = generation
+                    came_from[neighbor] = current
+                    g_score[neighbor] = temp_g_score
+                    queued = neighbor in open_set
+                    open_set.push(neighbor, temp_g_score + estimate(grid, neighbor, end), temp_g_score)
+                    pushes += 1
+                    if not queued:
+                        yield EVENT_OPEN, neighbor
+
+            yield EVENT_CLOSED, current
+
+    return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+
+def dijkstra(grid, start, end, open_list='heap', tie_break='fifo'):
+    expansions = 0
+    peak_open = 0
+    pushes = 1
+    open_set = make_open_list(open_list, tie_break)
+    open_set.push(start, 0, 0)
+
+    with grid.workspace() as work:
+        stamp, generation = work.stamp, work.generation
+        came_from, distance = work.parent, work.cost
+        stamp[start] = generation
+        distance[start] = 0
+
+        while open_set:
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+            current = open_set.pop()
+            expansions += 1
+
+            if current == end:
+                path = reconstruct_path(came_from, start, end)
+                yield from emit_path(path)
+                return SearchResult(True, path, expansions, peak_open=peak_open, cost=distance[end],
+                                    pushes=pushes)
+
+            distance_current = distance[current]
+            for neighbor, step in grid.moves(current):
+                temp_distance = distance_current + step
+                if stamp[neighbor] != generation or temp_distance < distance[neighbor]:
+                    stamp[neighbor] = generation
+                    came_from[neighbor] = current
+                    distance[neighbor] = temp_distance
+                    queued = neighbor in open_set
+                    open_set.push(neighbor, temp_distance, temp_distance)
+                    pushes += 1
+                    if not queued:
+                        yield EVENT_OPEN, neighbor
+
+            yield EVENT_CLOSED, current
+
+    return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+
+
+BFS_ENGINES = ('loop', 'vector')
+
+def bfs(grid, start, end, engine='loop'):
+    """
+    Breadth-first search. engine='vector' expands whole layers with NumPy
+    (see wavefront.py), which is much faster on large open grids.
+    """
+    if engine == 'vector':
+        import wavefront  # Optional NumPy backend, loaded only when asked for
+        return (yield from wavefront.bfs_vector(grid, start, end))
+    if engine != 'loop':
+        raise ValueError(f"Unknown BFS engine '{engine}' (expected one of {BFS_ENGINES})")
+    expansions = 0
+    peak_open = 0
+    pushes = 1
+    queue = make_open_list('fifo')
+    queue.push(start)
+
+    with grid.workspace() as work:
+        stamp, generation, came_from = work.stamp, work.generation, work.parent
+        stamp[start] = generation # Marks start as visited
+
+        while queue:
+            if len(queue) > peak_open:
+                peak_open = len(queue)
+            current = queue.pop()
+            expansions += 1
+
+            if current == end:
+                path = reconstruct_path(came_from, start, end)
+                yield from emit_path(path)
+                return SearchResult(True, path, expansions, peak_open=peak_open, cost=path_cost(grid, path),
+                                    pushes=pushes)
+
+            for neighbor in grid.neighbors(current):
+                if stamp[neighbor] != generation:
+                    stamp[neighbor] = generation
+                    came_from[neighbor] = current
+                    queue.push(neighbor)
+                    pushes += 1
+                    yield EVENT_OPEN, neighbor
+
+            yield EVENT_CLOSED, current
+
+    return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+
+
+def dfs(grid, start, end):
+    expansions = 0
+    peak_open = 0
+    pushes = 1
+    stack = make_open_list('lifo')
+    stack.push(start)
+
+    with grid.workspace() as work:
+        stamp, generation, came_from = work.stamp, work.generation, work.parent
+        stamp[start] = generation # Marks start as visited
+
+        while stack:
+            if len(stack) > peak_open:
+                peak_open = len(stack)
+            current = stack.pop()
+            expansions += 1
+            yield EVENT_CURRENT, current
+
+            if current == end:
+                path = reconstruct_path(came_from, start, end)
+                yield EVENT_RESET, None
+                yield from emit_path(path)
+                return SearchResult(True, path, expansions, peak_open=peak_open, cost=path_cost(grid, path),
+                                    pushes=pushes)
+
+            for neighbor in reversed(grid.neighbors(current)):
+                if stamp[neighbor] != generation:
+                    stamp[neighbor] = generation
+                    came_from[neighbor] = current
+                    stack.push(neighbor)
+                    pushes += 1
+                    yield EVENT_OPEN, neighbor
+
+            yield EVENT_CLOSED, current
+
+    return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+
+
+# --- Jump Point Search ---
+def expand_jumps(jump_path, cols):
+    """Fills in the straight runs between consecutive jump points."""
+    path = jump_path[:1]
+    for a, b in zip(jump_path, jump_path[1:]):
+        if a // cols == b // cols:
+            step = 1 if b > a else -1
+        else:
+            step = cols if b > a else -cols
+        path.extend(range(a + step, b + step, step))
+    return path
+
+def jps(grid, start, end, open_list='heap', tie_break='high_g'):
+    """
+    Jump Point Search for the uniform-cost 4-connected grid. It is A* over
+    jump points only: from each expanded cell it scans straight ahead past
+    symmetric cells until it reaches the goal, a cell with a forced
+    neighbor, or (on vertical scans) a row that has a horizontal jump point.
+    Path costs match a_star; expansions drop sharply on open maps.
+    Terrain costs break the path symmetry JPS relies on and the scans are
+    4-connected, so on a weighted or 8-connected grid this runs a_star.
+    """
+    if grid.weighted or grid.connectivity != 4:
+        result = yield from a_star(grid, start, end, open_list, tie_break)
+        result.message = "JPS needs a uniform-cost 4-connected grid; ran A* instead"
+        return result
+    rows, cols = grid.rows, grid.cols
+    end_row, end_col = divmod(end, cols)
+    # Horizontal scans search this with bytes.find, so a vertical scan's
+    # probes along every row it passes run in C rather than cell by cell.
+    walk = grid.walkable_bytes()
+    # Vertical scans probe the same runs again and again; the answers are
+    # kept per (cell, direction), so memory follows the cells probed.
+    horizontal_jumps = {}
+
+    def walkable(row, col):
+        return 0 <= row < rows and 0 <= col < cols and walk[row * cols + col]
+
+    def jump_horizontal(row, col, dc):
+        # Every scan starts next to a cell on the row, so col is at most one off it
+        if not 0 <= col < cols or not walk[row * cols + col]:
+            return NO_PARENT
+        # A cell is a jump point if the cell above (or below) it is open
+        # while the one before that is a barrier: a 0, 1 byte pair in the
+        # scan direction, searched for in the row above and the row below.
+        base = row * cols
+        key = base + col if dc > 0 else ~(base + col)
+        if key in horizontal_jumps:
+            return horizontal_jumps[key]
+        if dc > 0:
+            stop = walk.find(0, base + col, base + cols)  # First barrier ends the run
+            if stop < 0:
+                stop = base + cols
+            jump_point = stop
+            if base + col <= end < jump_point:
+                jump_point = end
+            for side in (base - cols, base + cols):
+                if 0 <= side < grid.size:
+                    forced = walk.find(b'\x00\x01', side + col - 1, side + cols)
+                    if forced >= 0 and forced + 1 - side + base < jump_point:
+                        jump_point = forced + 1 - side + base
+        else:
+            stop = walk.rfind(0, base, base + col + 1)
+            if stop < 0:
+                stop = base - 1
+            jump_point = stop
+            if jump_point < end <= base + col:
+                jump_point = end
+            for side in (base - cols, base + cols):
+                if 0 <= side < grid.size:
+                    forced = walk.rfind(b'\x01\x00', side, side + min(col + 2, cols))
+                    if forced >= 0 and forced - side + base > jump_point:
+                        jump_point = forced - side + base
+        if jump_point == stop:
+            jump_point = NO_PARENT
+        horizontal_jumps[key] = jump_point
+        return jump_point
+
+    def jump_vertical(row, col, dr):
+        while walkable(row, col):
+            if (row == end_row and col == end_col) \
+                    or (walkable(row, col - 1) and not walkable(row - dr, col - 1)) \
+                    or (walkable(row, col + 1) and not walkable(row - dr, col + 1)) \
+                    or jump_horizontal(row, col + 1, 1) != NO_PARENT \
+                    or jump_horizontal(row, col - 1, -1) != NO_PARENT:
+                return row * cols + col
+            row += dr
+        return NO_PARENT
+
+    def successors(cell, parent):
+        row, col = divmod(cell, cols)
+        if parent == NO_PARENT:
+            directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+        else:
+            parent_row, parent_col = divmod(parent, cols)
+            if parent_row == row:  # Arrived horizontally
+                dc = 1 if col > parent_col else -1
+                directions = ((1, 0), (-1, 0), (0, dc))
+            else:
+                dr = 1 if row > parent_row else -1
+                directions = ((0, 1), (0, -1), (dr, 0))
+        for dr, dc in directions:
+            if dr:
+                jump_point = jump_vertical(row + dr, col, dr)
+            else:
+                jump_point = jump_horizontal(row, col + dc, dc)
+            if jump_point != NO_PARENT:
+                yield jump_point
+
+    expansions = 0
+    peak_open = 0
+    pushes = 1
+    open_set = make_open_list(open_list, tie_break)
+    open_set.push(start, h(grid, start, end), 0)
+
+    with grid.workspace() as work:
+        stamp, generation = work.stamp, work.generation
+        came_from, g_score = work.parent, work.cost
+        stamp[start] = generation
+        came_from[start] = NO_PARENT
+        g_score[start] = 0
+
+        while open_set:
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+            current = open_set.pop()
+            expansions += 1
+
+            if current == end:
+                path = expand_jumps(reconstruct_path(came_from, start, end), cols)
+                yield from emit_path(path)
+                return SearchResult(True, path, expansions, peak_open=peak_open, pushes=pushes)
+
+            for jump_point in successors(current, came_from[current]):
+                temp_g_score = g_score[current] + h(grid, current, jump_point)
+                if stamp[jump_point] != generation or temp_g_score < g_score[jump_point]:
+                    stamp[jump_point] = generation
+                    came_from[jump_point] = current
+                    g_score[jump_point] = temp_g_score
+                    queued = jump_point in open_set
+                    open_set.push(jump_point, temp_g_score + h(grid, jump_point, end), temp_g_score)
+                    pushes += 1
+                    if not queued:
+                        yield EVENT_OPEN, jump_point
+
+            yield EVENT_CLOSED, current
+
+    return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+
+
+# --- Bidirectional Search ---
+# Both variants grow one frontier from start (EVENT_OPEN/EVENT_CLOSED) and
+# one from end (EVENT_OPEN_REVERSE/EVENT_CLOSED_REVERSE), track the shortest
+# start-to-end connection seen so far, and stop once it provably can't be beaten.
+
+def join_paths(came_from_start, start, forward_cell, came_from_end, end, backward_cell):
+    """Path start -> forward_cell -> backward_cell -> end from the two parent arrays."""
+    path = reconstruct_path(came_from_start, start, forward_cell)
+    backward = reconstruct_path(came_from_end, end, backward_cell)
+    backward.reverse()
+    return path + backward
+
+def _expand_layer(grid, frontier, work, other, open_event, closed_event):
+    """
+    Expands one whole BFS layer, keeping depths in work.cost. Returns the
+    next layer and the shortest connection (length, cell, other-side
+    neighbor) to the other search's workspace, or None.
+    """
+    stamp, generation, came_from, depth = work.stamp, work.generation, work.parent, work.cost
+    other_stamp, other_generation, other_depth = other.stamp, other.generation, other.cost
+    next_frontier = []
+    best = None
+    for current in frontier:
+        next_depth = depth[current] + 1
+        for neighbor in grid.neighbors(current):
+            if other_stamp[neighbor] == other_generation:
+                length = next_depth + other_depth[neighbor]
+                if best is None or length < best[0]:
+                    best = (length, current, neighbor)
+            if stamp[neighbor] != generation:
+                stamp[neighbor] = generation
+                depth[neighbor] = next_depth
                 came_from[neighbor] = current
-                stack.append(neighbor)
-                if neighbor != end: neighbor.make_open()
-
-        if current != start and current != end and not current.is_path():
-             current.make_closed()
-
-    return False
-
-
-def hill_climbing(visualizer, grid, start, end):
+                next_frontier.append(neighbor)
+                yield open_event, neighbor
+        yield closed_event, current
+    return next_frontier, best
+
+def bidirectional_bfs(grid, start, end):
+    """
+    Breadth-first search from both ends, one whole layer at a time on the
+    smaller side. The first layer that touches the other search contains a
+    shortest connection, so the search stops when that layer is finished.
+    """
+    if start == end:
+        return SearchResult(True, [start])
+    expansions = 0
+    peak_open = 0
+    pushes = 2
+    forward, backward = [start], [end]
+
+    # One workspace per side; depths live in their cost arrays
+    with grid.workspace() as work_start, grid.workspace() as work_end:
+        for work, source in ((work_start, start), (work_end, end)):
+            work.stamp[source] = work.generation
+            work.cost[source] = 0
+
+        while forward and backward:
+            if len(forward) + len(backward) > peak_open:
+                peak_open = len(forward) + len(backward)
+            if len(forward) <= len(backward):
+                expansions += len(forward)
+                forward, best = yield from _expand_layer(
+                    grid, forward, work_start, work_end, EVENT_OPEN, EVENT_CLOSED)
+                pushes += len(forward)
+                if best:
+                    _, forward_cell, backward_cell = best
+            else:
+                expansions += len(backward)
+                backward, best = yield from _expand_layer(
+                    grid, backward, work_end, work_start, EVENT_OPEN_REVERSE, EVENT_CLOSED_REVERSE)
+                pushes += len(backward)
+                if best:
+                    _, backward_cell, forward_cell = best
+            if best:
+                path = join_paths(work_start.parent, start, forward_cell, work_end.parent, end, backward_cell)
+                yield from emit_path(path)
+                return SearchResult(True, path, expansions, peak_open=peak_open, cost=path_cost(grid, path),
+                                    pushes=pushes)
+
+    return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+
+def bidirectional_a_star(grid, start, end, open_list='heap', tie_break='high_g', heuristic=None):
+    """
+    A* from both ends, expanding the side with the smaller open list. The
+    two sides share one balanced potential, so cells are keyed by
+    2g + h(cell, target) - h(cell, source); once the two smallest keys sum to
+    twice the best connection length found, no shorter path remains.
+    Needs a priority open list ('heap', 'indexed' or 'bucket').
+    """
+    estimate = heuristics.resolve(grid, heuristic)
+    if start == end:
+        return SearchResult(True, [start])
+    expansions = 0
+    peak_open = 0
+    pushes = 2
+    open_start = make_open_list(open_list, tie_break)
+    open_end = make_open_list(open_list, tie_break)
+    open_start.push(start, estimate(grid, start, end), 0)
+    open_end.push(end, estimate(grid, end, start), 0)
+    best_length = UNSEEN
+    meeting = None  # (cell on the start side, cell on the end side)
+
+    with grid.workspace() as work_start, grid.workspace() as work_end:
+        for work, source in ((work_start, start), (work_end, end)):
+            work.stamp[source] = work.generation
+            work.cost[source] = 0
+
+        while open_start and open_end:
+            if len(open_start) + len(open_end) > peak_open:
+                peak_open = len(open_start) + len(open_end)
+            if open_start.min_priority() + open_end.min_priority() >= 2 * best_length:
+                break
+
+            forward = len(open_start) <= len(open_end)
+            if forward:
+                open_set, work, other = open_start, work_start, work_end
+                target, source, open_event, closed_event = end, start, EVENT_OPEN, EVENT_CLOSED
+            else:
+                open_set, work, other = open_end, work_end, work_start
+                target, source, open_event, closed_event = start, end, EVENT_OPEN_REVERSE, EVENT_CLOSED_REVERSE
+            stamp, generation, came_from, g_score = work.stamp, work.generation, work.parent, work.cost
+            other_stamp, other_generation, other_g = other.stamp, other.generation, other.cost
+            current = open_set.pop()
+            expansions += 1
+
+            # Moves cost the cell they enter: the neighbor going forward, and
+            # 'current' on the goal side, whose moves run neighbor -> current.
+            g_current = g_score[current]
+            for neighbor, step in grid.moves(current, reverse=not forward):
+                temp_g_score = g_current + step
+                if stamp[neighbor] != generation or temp_g_score < g_score[neighbor]:
+                    stamp[neighbor] = generation
+                    came_from[neighbor] = current
+                    g_score[neighbor] = temp_g_score
+                    queued = neighbor in open_set
+                    key = 2 * temp_g_score + estimate(grid, neighbor, target) - estimate(grid, neighbor, source)
+                    open_set.push(neighbor, key, temp_g_score)
+                    pushes += 1
+                    if not queued:
+                        yield open_event, neighbor
+                if other_stamp[neighbor] == other_generation and temp_g_score + other_g[neighbor] < best_length:
+                    best_length = temp_g_score + other_g[neighbor]
+                    meeting = (current, neighbor) if forward else (neighbor, current)
+
+            yield closed_event, current
+
+        if meeting is None:
+            return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+        path = join_paths(work_start.parent, start, meeting[0], work_end.parent, end, meeting[1])
+    yield from emit_path(path)
+    return SearchResult(True, path, expansions, peak_open=peak_open, cost=best_length, pushes=pushes)
+
+
+def hill_climbing(grid, start, end):
     current = start
-    came_from = {}
-    path_nodes_visited = {start}
-
-    while current != end and not visualizer.stop_requested:
-        visualizer.check_for_quit()
-        if visualizer.stop_requested: break
-
-        neighbors = current.neighbors
-        valid_neighbors = [n for n in neighbors if n not in path_nodes_visited]
+    expansions = 0
 
-        if not valid_neighbors:
-            print("Hill Climbing Stuck: No unvisited neighbors.")
-            if current != start: current.make_closed()
-            visualizer.draw()
-            return False
+    with grid.workspace() as work:
+        stamp, generation, came_from = work.stamp, work.generation, work.parent
+        stamp[start] = generation # Marks start as visited
 
-        valid_neighbors.sort(key=lambda neighbor: h(neighbor.get_pos(), end.get_pos()))
-        best_neighbor = valid_neighbors[0]
+        while current != end:
+            expansions += 1
+            valid_neighbors = [n for n in grid.neighbors(current) if stamp[n] != generation]
 
-        if h(best_neighbor.get_pos(), end.get_pos()) >= h(current.get_pos(), end.get_pos()):
-            print(f"Hill Climbing Stuck: Best h={h(best_neighbor.get_pos(), end.get_pos())}, Current h={h(current.get_pos(), end.get_pos())}")
-            if current != start: current.make_closed()
-            visualizer.draw()
-            return False
+            if not valid_neighbors:
+                yield EVENT_CLOSED, current
+                return SearchResult(False, expansions=expansions, peak_open=1, pushes=expansions,
+                                    message="Hill Climbing Stuck: No unvisited neighbors.")
 
-        came_from[best_neighbor] = current
-        if current != start:
-            current.make_closed()
+            valid_neighbors.sort(key=lambda neighbor: h(grid, neighbor, end))
+            best_neighbor = valid_neighbors[0]
 
-        current = best_neighbor
-        path_nodes_visited.add(current)
-        if current != end:
-            current.make_open()
+            if h(grid, best_neighbor, end) >= h(grid, current, end):
+                yield EVENT_CLOSED, current
+                return SearchResult(False, expansions=expansions, peak_open=1, pushes=expansions,
+                                    message=f"Hill Climbing Stuck: Best h={h(grid, best_neighbor, end)}, Current h={h(grid, current, end)}")
 
-        visualizer.draw()
+            stamp[best_neighbor] = generation
+            came_from[best_neighbor] = current
+            yield EVENT_CLOSED, current
 
-    if current == end:
-        reconstruct_path(came_from, end, visualizer.draw, start)
-        if not visualizer.stop_requested:
-            end.make_end()
-            start.make_start()
-        return True
+            current = best_neighbor
+            yield EVENT_OPEN, current
 
-    return False
+        path = reconstruct_path(came_from, start, end)
+    yield from emit_path(path)
+    return SearchResult(True, path, expansions, peak_open=1, cost=path_cost(grid, path),
+                        pushes=len(path))
 
 
 # --- DLS / IDS ---
-def dls_recursive(visualizer, node, end, limit, visited, came_from, start):
-    visualizer.check_for_quit()
-    if visualizer.stop_requested:
-        return False, came_from, True # Found, CameFrom, Stopped
-
-    if node == end:
-        return True, came_from, False # Found, CameFrom, Not Stopped
-
+def dls(grid, start, end, limit, stats):
+    """
+    Depth-limited DFS on an explicit stack (no recursion). Returns
+    (path, next_limit): path is None if 'end' is more than 'limit' moves
+    away, and next_limit is the smallest limit that could still reach it,
+    or None if nothing was cut off (every reachable cell was searched).
+
+    best_depth (the workspace's parent array, holding depths) is a
+    transposition table: a cell is expanded again only when it is reached
+    at a lower depth than before. A plain visited set would keep a cell
+    first reached along a detour from being used by a shorter route. IDS
+    calls this once per iteration, and each call starts a new workspace
+    generation instead of filling a fresh array.
+    """
+    if start == end:
+        return [start], None
     if limit <= 0:
-        return False, came_from, False # Not Found, CameFrom, Not Stopped
-
-    visited.add(node)
-    if node != start and node != end:
-        node.make_current()
-    visualizer.draw()
-    #time.sleep(0.005)
-
-    found = False
-    stopped = False
-    for neighbor in node.neighbors:
-        if visualizer.stop_requested:
-             stopped = True
-             break
-
-        if neighbor not in visited:
-            came_from[neighbor] = node
-            found, came_from, stopped = dls_recursive(visualizer, neighbor, end, limit - 1, visited, came_from, start)
-            if found or stopped:
-                return found, came_from, stopped
-
-    if node != start and node != end and not node.is_path():
-        node.make_closed()
-
-    return False, came_from, stopped
-
-def lds(visualizer, grid, start, end, max_depth):
-    visualizer.clear_search_visualization(clear_only_search=True)
-    came_from = {}
-    visited = set()
-
-    print(f"LDS: Starting search with depth limit {max_depth}")
-    found, came_from_result, stopped = dls_recursive(visualizer, start, end, max_depth, visited, came_from, start)
-
-    visualizer.clear_search_visualization(clear_only_search=True, keep_current_algo_colors=True) # Clear cyan
-
-    if stopped:
-        print(f"LDS: Search stopped by user at depth limit {max_depth}.")
-        return False
-
-    if found:
-        print(f"LDS: Path found within depth {max_depth}")
-        reconstruct_path(came_from_result, end, visualizer.draw, start)
-        end.make_end()
-        start.make_start()
-        return True
-    else:
-        print(f"LDS: Path not found within depth {max_depth}")
-        if start: start.make_start()
-        if end: end.make_end()
-        visualizer.draw()
-        return False
-
-
-def ids(visualizer, grid, start, end):
-    max_grid_depth = ROWS * ROWS # Use ROWS from constants
-    for depth in range(max_grid_depth):
-        if visualizer.stop_requested:
-            print("IDS: Search stopped by user.")
-            return False
-
-        print(f"IDS: Trying depth {depth}")
-        visualizer.clear_search_visualization(clear_only_search=True)
-        start.make_start()
-        end.make_end()
-        visualizer.draw()
-        # time.sleep(0.1)
-
-        came_from = {}
-        visited = set()
-
-        found, came_from_result, stopped = dls_recursive(visualizer, start, end, depth, visited, came_from, start)
-
-        visualizer.clear_search_visualization(clear_only_search=True, keep_current_algo_colors=True) # Clear cyan
-
-        if stopped:
-            print(f"IDS: Search stopped by user during depth {depth}.")
-            return False
-
-        if found:
-            print(f"IDS: Path found at depth {depth}")
-            reconstruct_path(came_from_result, end, visualizer.draw, start)
-            end.make_end()
-            start.make_start()
-            return True
-
-        visualizer.check_for_quit()
-
-    print("IDS: Path not found (reached max possible depth)")
-    return False
\ No newline at end of file
+        return None, heuristics.min_moves(grid, start, end)
+
+    next_limit = UNSEEN
+    stats[0] += 1
+    yield EVENT_CURRENT, start
+    # Children are tried closest-to-goal first, so cells tend to be reached
+    # at their shallowest depth early and are re-expanded less often.
+    cols = grid.cols
+    end_row, end_col = divmod(end, cols)
+    by_distance = lambda cell: abs(cell // cols - end_row) + abs(cell % cols - end_col)
+    stack = [(start, iter(sorted(grid.neighbors(start), key=by_distance)))]
+
+    with grid.workspace() as work:
+        stamp, generation, best_depth = work.stamp, work.generation, work.parent
+        stamp[start] = generation
+        best_depth[start] = 0
+
+        while stack:
+            cell, children = stack[-1]
+            depth = len(stack) # Depth of cell's children
+            for neighbor in children:
+                if stamp[neighbor] == generation and depth >= best_depth[neighbor]:
+                    continue
+                stamp[neighbor] = generation
+                best_depth[neighbor] = depth
+                if neighbor == end:
+                    return [entry[0] for entry in stack] + [end], None
+                if depth >= limit:
+                    # Cut off: any path through here needs at least depth + h moves
+                    next_limit = min(next_limit, depth + heuristics.min_moves(grid, neighbor, end))
+                    continue
+                stats[0] += 1
+                yield EVENT_CURRENT, neighbor
+                stack.append((neighbor, iter(sorted(grid.neighbors(neighbor), key=by_distance))))
+                if len(stack) > stats[1]:
+                    stats[1] = len(stack)
+                break
+            else:
+                stack.pop()
+                yield EVENT_CLOSED, cell
+
+    return None, (None if next_limit == UNSEEN else next_limit)
+
+def lds(grid, start, end, max_depth):
+    stats = [0, 0] # Expansions and peak stack depth, shared with dls (every expanded cell was pushed once)
+
+    yield EVENT_RESET, None
+    path, _ = yield from dls(grid, start, end, max_depth, stats)
+    yield EVENT_RESET, None # Clear cyan
+
+    if path:
+        yield from emit_path(path)
+        return SearchResult(True, path, stats[0], peak_open=stats[1], cost=path_cost(grid, path),
+                            pushes=stats[0], message=f"LDS: Path found within depth {max_depth}")
+    return SearchResult(False, expansions=stats[0], peak_open=stats[1], pushes=stats[0],
+                        message=f"LDS: Path not found within depth {max_depth}")
+
+
+def ids(grid, start, end):
+    stats = [0, 0] # Expansions and peak stack depth, shared with dls (every expanded cell was pushed once)
+    iterations = 0
+    # No path takes fewer moves than min_moves(), and each failed iteration
+    # reports the next limit that can make progress.
+    depth = heuristics.min_moves(grid, start, end)
+    while depth is not None:
+        iterations += 1
+        yield EVENT_RESET, None
+
+        path, depth = yield from dls(grid, start, end, depth, stats)
+
+        if path:
+            yield EVENT_RESET, None # Clear cyan
+            yield from emit_path(path)
+            return SearchResult(True, path, stats[0], peak_open=stats[1], cost=path_cost(grid, path),
+                                pushes=stats[0], message=f"IDS: Path found at depth {len(path) - 1} after {iterations} iterations")
+
+    return SearchResult(False, expansions=stats[0], peak_open=stats[1], pushes=stats[0],
+                        message=f"IDS: Path not found (all reachable cells searched in {iterations} iterations)")
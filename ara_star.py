@@ -0,0 +1,135 @@
+"""
+Anytime Repairing A* (ARA*, Likhachev, Gordon and Thrun, 2003).
+
+ARA* runs weighted A* with priority g + epsilon * h, which finds a path
+quickly whose cost is at most epsilon times the optimum. It then lowers
+epsilon and searches again, but reuses what it already knows: g-costs
+and parents are kept, and each pass only re-expands the cells whose
+g-cost improved since they were expanded (the INCONS list) plus the
+frontier. Every pass publishes its path with a proven bound
+    cost / optimal <= min(epsilon, g(end) / min(g + h over OPEN and INCONS))
+so a caller can stop at any time with a usable answer. The search ends
+when the bound reaches 1 (optimal) or the deadline runs out.
+
+Each published path is announced with an EVENT_SOLUTION event whose cell
+is a SearchResult carrying the path, its cost and its bound; the cells of
+the path it replaces are painted closed again. The heuristic must be
+consistent for the bounds to hold, as heuristics.py's defaults are.
+"""
+import time
+from constants import *
+from algorithms import SearchResult, emit_path, reconstruct_path, path_cost
+from open_list import make_open_list
+import heuristics
+
+DEFAULT_EPSILON = 3.0  # Inflation of the first pass
+DEFAULT_EPSILON_STEP = 0.5  # Lowered by this much after each pass
+
+
+def ara_star(grid, start, end, epsilon=DEFAULT_EPSILON, epsilon_step=DEFAULT_EPSILON_STEP,
+             deadline=None, heuristic=None, tie_break='high_g'):
+    """
+    ARA*. 'deadline' (seconds from the start, None for no limit) stops the
+    improvement passes; the first path is always searched for in full.
+    The result's bound says how far its cost may be from optimal.
+    """
+    if epsilon < 1:
+        raise ValueError(f"epsilon must be at least 1, not {epsilon}")
+    if epsilon_step <= 0:
+        raise ValueError(f"epsilon_step must be positive, not {epsilon_step}")
+    estimate = heuristics.resolve(grid, heuristic)
+    clock = time.perf_counter
+    stop_at = None if deadline is None else clock() + deadline
+    expansions = 0
+    peak_open = 0
+    pushes = 1
+    passes = 0
+    best = None  # Latest published SearchResult
+    open_set = make_open_list('heap', tie_break)
+    open_set.push(start, epsilon * estimate(grid, start, end), 0)
+    incons = set()  # Cells improved after this pass expanded them
+
+    with grid.workspace() as work:
+        stamp, generation = work.stamp, work.generation
+        came_from, g_score = work.parent, work.cost
+        stamp[start] = generation
+        g_score[start] = 0
+
+        while True:
+            # --- One weighted A* pass, until no queued cell can beat the path to end ---
+            passes += 1
+            closed = set()
+            timed_out = False
+            while open_set and (stamp[end] != generation or g_score[end] > open_set.min_priority()):
+                if stop_at is not None and best is not None and clock() > stop_at:
+                    timed_out = True
+                    break
+                if len(open_set) > peak_open:
+                    peak_open = len(open_set)
+                current = open_set.pop()
+                closed.add(current)
+                expansions += 1
+
+                g_current = g_score[current]
+                for neighbor, step in grid.moves(current):
+                    temp_g_score = g_current + step
+                    if stamp[neighbor] != generation or temp_g_score < g_score[neighbor]:
+                        stamp[neighbor] = generation
+                        came_from[neighbor] = current
+                        g_score[neighbor] = temp_g_score
+                        if neighbor in closed:
+                            incons.add(neighbor)
+                            continue
+                        queued = neighbor in open_set
+                        open_set.push(neighbor, temp_g_score + epsilon * estimate(grid, neighbor, end),
+                                      temp_g_score)
+                        pushes += 1
+                        if not queued:
+                            yield EVENT_OPEN, neighbor
+
+                yield EVENT_CLOSED, current
+
+            if timed_out:
+                yield from emit_path(best.path)  # Later passes may have painted over it
+                best.message = (f"ARA*: deadline of {deadline}s reached after {passes - 1} pass(es); "
+                                f"cost within {best.bound:.3g}x optimal")
+                break
+            if stamp[end] != generation:
+                return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+
+            # --- Publish the pass's path and its bound ---
+            # The next pass queues the frontier and INCONS again under the
+            # new epsilon; draining the open list also lists the frontier.
+            frontier = incons
+            incons = set()
+            while open_set:
+                frontier.add(open_set.pop())
+            # Cells improved late in the pass (INCONS) may have re-parented
+            # part of the path since end was reached, so its cost is taken
+            # from the path itself rather than from g(end)
+            path = reconstruct_path(came_from, start, end)
+            cost = path_cost(grid, path)
+            lower = min((g_score[cell] + estimate(grid, cell, end) for cell in frontier), default=cost)
+            bound = min(epsilon, cost / lower) if lower > 0 else 1.0
+            if best is not None:
+                for cell in best.path[1:-1]:
+                    yield EVENT_CLOSED, cell
+            yield from emit_path(path)
+            best = SearchResult(True, path, expansions, peak_open=peak_open, cost=cost, pushes=pushes,
+                                bound=bound)
+            yield EVENT_SOLUTION, best
+            if bound <= 1:
+                best.message = f"ARA*: optimal after {passes} pass(es)"
+                break
+            if stop_at is not None and clock() > stop_at:
+                best.message = (f"ARA*: deadline of {deadline}s reached after {passes} pass(es); "
+                                f"cost within {bound:.3g}x optimal")
+                break
+
+            epsilon = max(1.0, min(epsilon - epsilon_step, bound))
+            for cell in frontier:
+                open_set.push(cell, g_score[cell] + epsilon * estimate(grid, cell, end), g_score[cell])
+            pushes += len(frontier)
+
+    return SearchResult(True, best.path, expansions, message=best.message, peak_open=peak_open,
+                        cost=best.cost, pushes=pushes, bound=best.bound)
@@ -0,0 +1,120 @@
+"""
+Batch solver: answers many (start, end) queries on one grid in parallel.
+
+The grid's cell, link and cost bytes are copied once into a
+multiprocessing.shared_memory block. Each pool worker wraps that block in
+a read-only GridModel without copying it, so tasks carry only the query
+itself. Results stream back in completion order.
+
+Usage:
+    python batch.py --map random20 --size 512 --queries 2000 --algorithm a_star
+    python batch.py --map maze --size 256 --queries 1000 --scaling
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from multiprocessing import shared_memory
+from constants import STATE_BARRIER
+from grid_model import GridModel
+import benchmark
+import solver
+
+# --- Worker Side ---
+# Set once per worker process by _attach()
+_memory = None
+_grid = None
+
+def _attach(name, rows, cols, connectivity, corner_cutting):
+    """Pool initializer: maps the published grid into this worker."""
+    global _memory, _grid
+    _memory = shared_memory.SharedMemory(name=name)
+    size = rows * cols
+    view = _memory.buf.toreadonly()
+    _grid = GridModel(rows, cols, cells=view[:size], links=view[size:2 * size],
+                      costs=view[2 * size:3 * size], connectivity=connectivity,
+                      corner_cutting=corner_cutting)
+
+def _solve_query(task):
+    index, start, end, algorithm, args, params, time_limit = task
+    result = solver.solve(algorithm, _grid, start, end, *args, time_limit=time_limit, **params)
+    return index, result
+
+
+# --- Batch API ---
+def solve_batch(grid, queries, algorithm='a_star', *args, processes=None,
+                chunksize=None, time_limit=None, **params):
+    """
+    Solves every (start, end) in 'queries' with the named algorithm and
+    yields (query index, SearchResult) pairs as workers finish them. The
+    grid is snapshotted when the batch starts; later edits are not seen.
+    """
+    if algorithm not in solver.ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}' (expected one of {tuple(solver.ALGORITHMS)})")
+    queries = list(queries)
+    if not queries:
+        return
+    processes = processes or os.cpu_count() or 1
+    if chunksize is None:
+        # A few chunks per worker: little IPC overhead, still balanced
+        chunksize = max(1, len(queries) // (processes * 4))
+
+    size = grid.size
+    memory = shared_memory.SharedMemory(create=True, size=3 * size)
+    try:
+        memory.buf[:size] = grid.cells
+        memory.buf[size:2 * size] = grid.links
+        memory.buf[2 * size:3 * size] = grid.costs
+        tasks = ((index, start, end, algorithm, args, params, time_limit)
+                 for index, (start, end) in enumerate(queries))
+        with multiprocessing.Pool(processes, initializer=_attach,
+                                  initargs=(memory.name, grid.rows, grid.cols,
+                                            grid.connectivity, grid.corner_cutting)) as pool:
+            yield from pool.imap_unordered(_solve_query, tasks, chunksize)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def random_queries(grid, count, seed=0):
+    """'count' random (start, end) pairs of walkable cells."""
+    rng = random.Random(seed)
+    open_cells = [index for index in range(grid.size) if grid.cells[index] != STATE_BARRIER]
+    return [(rng.choice(open_cells), rng.choice(open_cells)) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many queries on one map across a process pool.")
+    parser.add_argument("--map", default="random20", help=f"corpus map ({', '.join(benchmark.CORPUS)})")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--algorithm", default="a_star")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--scaling", action="store_true", help="repeat with 1, 2, 4, ... processes up to --processes")
+    parser.add_argument("--seed", type=int, default=benchmark.DEFAULT_SEED)
+    args = parser.parse_args()
+
+    grid, _, _ = benchmark.build_map(args.map, args.size, args.seed)
+    queries = random_queries(grid, args.queries, args.seed)
+    extra = benchmark.ALGORITHM_ARGS.get(args.algorithm, lambda grid: ())(grid)
+    counts = [args.processes]
+    if args.scaling:
+        counts = sorted({min(2 ** power, args.processes) for power in range(args.processes.bit_length() + 1)})
+
+    print(f"{args.queries} {args.algorithm} queries on {args.map} {args.size}x{args.size}")
+    baseline = None
+    for processes in counts:
+        started = time.perf_counter()
+        found = 0
+        for _, result in solve_batch(grid, queries, args.algorithm, *extra, processes=processes):
+            found += result.found
+        elapsed = time.perf_counter() - started
+        throughput = args.queries / elapsed
+        baseline = baseline or throughput
+        print(f"  {processes:>3} processes: {elapsed:8.2f}s  {throughput:9.1f} queries/s  "
+              f"x{throughput / baseline:.2f}  ({found} found)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
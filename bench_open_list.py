@@ -0,0 +1,93 @@
+"""
+Micro-benchmark of the open lists in open_list.py against the thread-safe
+queue.PriorityQueue / queue.Queue (plus membership set) they replaced.
+
+Usage: python bench_open_list.py [--ops N] [--repeat R]
+"""
+import argparse
+import random
+import time
+from queue import PriorityQueue, Queue
+from open_list import make_open_list
+
+
+def _priorities(ops, seed=0):
+    rng = random.Random(seed)
+    return [(rng.randrange(ops), cell) for cell in range(ops)]
+
+
+def bench_priority_queue(items):
+    """Old a_star pattern: PriorityQueue of (f, count, cell) plus a membership set."""
+    open_set = PriorityQueue()
+    open_set_hash = set()
+    for count, (priority, cell) in enumerate(items):
+        open_set.put((priority, count, cell))
+        open_set_hash.add(cell)
+    while not open_set.empty():
+        cell = open_set.get()[2]
+        open_set_hash.remove(cell)
+
+
+def bench_open_list(kind, tie_break):
+    def run(items):
+        open_set = make_open_list(kind, tie_break)
+        for priority, cell in items:
+            open_set.push(cell, priority, priority)
+        while open_set:
+            open_set.pop()
+    return run
+
+
+def bench_queue(items):
+    """Old bfs pattern: queue.Queue."""
+    queue = Queue()
+    for _, cell in items:
+        queue.put(cell)
+    while not queue.empty():
+        queue.get()
+
+
+def bench_decrease_key(kind):
+    """Pushes every cell twice, the second time with a better priority."""
+    def run(items):
+        open_set = make_open_list(kind)
+        for priority, cell in items:
+            open_set.push(cell, priority + len(items))
+        for priority, cell in items:
+            open_set.push(cell, priority)
+        while open_set:
+            open_set.pop()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ops", type=int, default=200_000, help="cells pushed and popped per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best is reported")
+    args = parser.parse_args()
+
+    items = _priorities(args.ops)
+    cases = [
+        ("queue.PriorityQueue + set", bench_priority_queue),
+        ("heap (lazy deletion)", bench_open_list('heap', 'fifo')),
+        ("heap, high_g ties", bench_open_list('heap', 'high_g')),
+        ("indexed heap", bench_open_list('indexed', 'fifo')),
+        ("bucket (Dial)", bench_open_list('bucket', 'fifo')),
+        ("queue.Queue", bench_queue),
+        ("fifo (deque)", bench_open_list('fifo', 'fifo')),
+        ("heap decrease-key x2", bench_decrease_key('heap')),
+        ("indexed decrease-key x2", bench_decrease_key('indexed')),
+        ("bucket decrease-key x2", bench_decrease_key('bucket')),
+    ]
+    print(f"{args.ops} push+pop pairs, best of {args.repeat}")
+    for name, run in cases:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            run(items)
+            best = min(best, time.perf_counter() - started)
+        print(f"  {name:<28} {best * 1e9 / args.ops:8.0f} ns per push+pop")
+
+
+if __name__ == "__main__":
+    main()
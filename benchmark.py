@@ -0,0 +1,288 @@
+"""
+Reproducible benchmark of the algorithms in algorithms.py, run headlessly
+on a fixed corpus of seeded grids.
+
+Usage:
+    python benchmark.py                          # full corpus, results.json
+    python benchmark.py --sizes 50,128 --algorithms a_star,bfs --output run.json
+    python benchmark.py --baseline baseline.json --threshold 0.10
+    python benchmark.py --connectivity 4,8 --algorithms a_star --heuristics octile,euclidean,zero
+
+Every (map, size, algorithm) case runs in a fresh worker process so its
+peak RSS is its own. --connectivity runs every case on 4- and/or
+8-connected grids, and --heuristics repeats the heuristic searches once
+per heuristic (skipping any that is not admissible for the connectivity). With --baseline the run is compared case by case and
+the exit status is 1 if anything regressed by more than the threshold.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+from constants import STATE_BARRIER, STATE_EMPTY
+from grid_model import GridModel
+import heuristics
+import solver
+
+try:
+    import resource  # Unix only; peak RSS is reported as None elsewhere
+except ImportError:
+    resource = None
+
+DEFAULT_SIZES = (50, 128, 256, 512, 1024, 2048)
+DEFAULT_SEED = 2024
+MIN_COMPARED_TIME = 0.01  # Faster cases are too noisy for time regressions
+
+
+# --- Map Corpus ---
+# Each generator fills grid.cells for a given rng and returns (start, end).
+# Cells are written directly and linked once with rebuild_links().
+
+def _open_field(grid, rng):
+    return 0, grid.size - 1
+
+def _random_obstacles(density):
+    def generate(grid, rng):
+        cells = grid.cells
+        for index in rng.sample(range(grid.size), int(grid.size * density)):
+            cells[index] = STATE_BARRIER
+        # Keep a 3x3 block clear at both corners so start and end are not walled in
+        for row in range(min(3, grid.rows)):
+            for col in range(min(3, grid.cols)):
+                cells[grid.index(row, col)] = STATE_EMPTY
+                cells[grid.index(grid.rows - 1 - row, grid.cols - 1 - col)] = STATE_EMPTY
+        return 0, grid.size - 1
+    return generate
+
+def _maze(grid, rng):
+    """Recursive-backtracker maze carved on the odd (row, col) lattice (size >= 3)."""
+    rows, cols = grid.rows, grid.cols
+    cells = grid.cells
+    cells[:] = bytes([STATE_BARRIER]) * grid.size
+    cells[grid.index(1, 1)] = STATE_EMPTY
+    stack = [(1, 1)]
+    while stack:
+        row, col = stack[-1]
+        moves = [(dr, dc) for dr, dc in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                 if 0 < row + dr < rows - 1 and 0 < col + dc < cols - 1
+                 and cells[grid.index(row + dr, col + dc)] == STATE_BARRIER]
+        if not moves:
+            stack.pop()
+            continue
+        dr, dc = rng.choice(moves)
+        cells[grid.index(row + dr // 2, col + dc // 2)] = STATE_EMPTY
+        cells[grid.index(row + dr, col + dc)] = STATE_EMPTY
+        stack.append((row + dr, col + dc))
+    # Bottom-right lattice cell: the largest odd coordinate inside the border
+    last_row = rows - 3 if rows % 2 == 0 else rows - 2
+    last_col = cols - 3 if cols % 2 == 0 else cols - 2
+    return grid.index(1, 1), grid.index(last_row, last_col)
+
+def _rooms(grid, rng, room=16):
+    """Square rooms separated by one-cell walls, with a door in each wall."""
+    rows, cols = grid.rows, grid.cols
+    cells = grid.cells
+    for row in range(0, rows, room):
+        cells[row * cols:(row + 1) * cols] = bytes([STATE_BARRIER]) * cols
+    for col in range(0, cols, room):
+        for row in range(rows):
+            cells[row * cols + col] = STATE_BARRIER
+    for row in range(0, rows, room):
+        for col in range(0, cols, room):
+            # One door in the wall below and one in the wall right of each room
+            if row + room < rows:
+                cells[grid.index(row + room, min(cols - 1, col + rng.randrange(1, room)))] = STATE_EMPTY
+            if col + room < cols:
+                cells[grid.index(min(rows - 1, row + rng.randrange(1, room)), col + room)] = STATE_EMPTY
+    start = grid.index(min(rows - 1, 1), min(cols - 1, 1))
+    end = grid.index(max(0, rows - 2), max(0, cols - 2))
+    cells[start] = cells[end] = STATE_EMPTY
+    return start, end
+
+CORPUS = {
+    'open': _open_field,
+    'random10': _random_obstacles(0.10),
+    'random20': _random_obstacles(0.20),
+    'random30': _random_obstacles(0.30),
+    'maze': _maze,
+    'rooms': _rooms,
+}
+
+# Extra positional arguments some algorithms need
+ALGORITHM_ARGS = {
+    'lds': lambda grid: (grid.rows + grid.cols,),
+}
+# Algorithms that take a heuristic= name from heuristics.HEURISTICS
+HEURISTIC_ALGORITHMS = ('a_star', 'ara_star', 'bidirectional_a_star', 'sma_star', 'beam_search')
+
+
+def build_map(name, size, seed=DEFAULT_SEED, connectivity=4):
+    """Builds a corpus map; the same (name, size, seed) always gives the same grid."""
+    grid = GridModel(size, connectivity=connectivity)
+    rng = random.Random(f"{name}-{size}-{seed}")
+    start, end = CORPUS[name](grid, rng)
+    grid.rebuild_links()
+    return grid, start, end
+
+
+# --- Running Cases ---
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+def run_case(case):
+    """Runs one (map, size, algorithm) case and returns its result record."""
+    map_name, size, algorithm, seed, time_limit, connectivity, heuristic = case
+    grid, start, end = build_map(map_name, size, seed, connectivity)
+    args = ALGORITHM_ARGS.get(algorithm, lambda grid: ())(grid)
+    params = {} if heuristic is None else {'heuristic': heuristic}
+    result = solver.solve(algorithm, grid, start, end, *args, time_limit=time_limit, **params)
+    if result.timed_out:
+        status = "timeout"
+    else:
+        status = "found" if result.found else "no_path"
+    return {
+        "map": map_name,
+        "size": size,
+        "algorithm": algorithm,
+        "connectivity": connectivity,
+        "heuristic": heuristic,  # None: the algorithm's default
+        "status": status,
+        "time_s": round(result.elapsed, 6),
+        "expansions": result.expansions,
+        "peak_open": result.peak_open,
+        "pushes": result.pushes,
+        "peak_rss_kb": _peak_rss_kb(),
+        # Diagonal moves make costs fractional; rounding keeps baselines comparable
+        "path_length": round(result.cost, 6) if isinstance(result.cost, float) else result.cost,
+    }
+
+def _heuristics_for(algorithm, connectivity, heuristic_names):
+    """Heuristics to run an algorithm with: [None] unless it takes one and some were asked for."""
+    if algorithm not in HEURISTIC_ALGORITHMS or not heuristic_names:
+        return [None]
+    return [name for name in heuristic_names if name in heuristics.ADMISSIBLE[connectivity]]
+
+def run_suite(maps, sizes, algorithms, seed=DEFAULT_SEED, time_limit=None, isolate=True,
+              connectivities=(4,), heuristic_names=None):
+    """Yields result records for every case, in order."""
+    cases = [(map_name, size, algorithm, seed, time_limit, connectivity, heuristic)
+             for connectivity in connectivities for size in sizes for map_name in maps
+             for algorithm in algorithms
+             for heuristic in _heuristics_for(algorithm, connectivity, heuristic_names)]
+    if not isolate:
+        for case in cases:
+            yield run_case(case)
+        return
+    # One task per worker process, so ru_maxrss is measured per case
+    with multiprocessing.Pool(processes=1, maxtasksperchild=1) as pool:
+        yield from pool.imap(run_case, cases)
+
+
+# --- Baseline Comparison ---
+def _case_key(record):
+    # Records from before connectivity and heuristics existed are 4-connected defaults
+    return (record["map"], record["size"], record["algorithm"],
+            record.get("connectivity", 4), record.get("heuristic"))
+
+def compare(results, baseline, threshold):
+    """Returns human-readable regressions of 'results' against 'baseline'."""
+    previous = {_case_key(record): record for record in baseline["results"]}
+    regressions = []
+    for record in results:
+        old = previous.get(_case_key(record))
+        if old is None:
+            continue
+        name = "/".join(str(part) for part in _case_key(record) if part is not None)
+        if record["status"] != old["status"] or record["path_length"] != old["path_length"]:
+            regressions.append(f"{name}: result changed from {old['status']} (length {old['path_length']}) "
+                               f"to {record['status']} (length {record['path_length']})")
+            continue
+        for metric in ("time_s", "expansions", "peak_open", "peak_rss_kb"):
+            before, after = old.get(metric), record.get(metric)
+            if metric == "time_s" and (before or 0) < MIN_COMPARED_TIME:
+                continue
+            if before and after is not None and after > before * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before} -> {after} "
+                                   f"(+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pathfinding algorithms headlessly.")
+    parser.add_argument("--maps", default=",".join(CORPUS), help="comma-separated corpus maps")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated grid sizes")
+    parser.add_argument("--algorithms", default=",".join(solver.ALGORITHMS), help="comma-separated algorithms")
+    parser.add_argument("--connectivity", default="4", help="comma-separated connectivities (4 and/or 8)")
+    parser.add_argument("--heuristics", help="comma-separated heuristics to compare on "
+                                             f"{', '.join(HEURISTIC_ALGORITHMS)} (default: each grid's best)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--time-limit", type=float, default=30.0, help="seconds per case before it counts as a timeout")
+    parser.add_argument("--no-isolate", action="store_true", help="run cases in this process (peak RSS becomes cumulative)")
+    parser.add_argument("--output", default="results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown before a case regresses")
+    args = parser.parse_args()
+
+    maps = args.maps.split(",")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    algorithms = args.algorithms.split(",")
+    connectivities = [int(connectivity) for connectivity in args.connectivity.split(",")]
+    heuristic_names = args.heuristics.split(",") if args.heuristics else None
+    for connectivity in connectivities:
+        if connectivity not in heuristics.ADMISSIBLE:
+            parser.error(f"unknown connectivity {connectivity} (choose from 4, 8)")
+        for name in heuristic_names or ():
+            if name not in heuristics.HEURISTICS:
+                parser.error(f"unknown heuristic '{name}' (choose from {', '.join(heuristics.HEURISTICS)})")
+            if name not in heuristics.ADMISSIBLE[connectivity]:
+                print(f"Skipping heuristic '{name}' on {connectivity}-connected grids (not admissible)")
+    for name in maps:
+        if name not in CORPUS:
+            parser.error(f"unknown map '{name}' (choose from {', '.join(CORPUS)})")
+    for name in algorithms:
+        if name not in solver.ALGORITHMS:
+            parser.error(f"unknown algorithm '{name}' (choose from {', '.join(solver.ALGORITHMS)})")
+
+    results = []
+    print(f"{'map':<9} {'size':>5} {'conn':>4} {'algorithm':<20} {'heuristic':<10} {'status':<8} {'time_s':>9} "
+          f"{'expanded':>10} {'peak_open':>9} {'rss_kb':>8} {'length':>10}")
+    for record in run_suite(maps, sizes, algorithms, args.seed, args.time_limit, not args.no_isolate,
+                            connectivities, heuristic_names):
+        results.append(record)
+        print(f"{record['map']:<9} {record['size']:>5} {record['connectivity']:>4} {record['algorithm']:<20} "
+              f"{str(record['heuristic'] or '-'):<10} {record['status']:<8} "
+              f"{record['time_s']:>9.4f} {record['expansions']:>10} {record['peak_open']:>9} "
+              f"{str(record['peak_rss_kb']):>8} {str(record['path_length']):>10}", flush=True)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "time_limit": args.time_limit,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        print(f"{len(regressions)} regression(s) against {args.baseline} at {args.threshold:.0%} threshold")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
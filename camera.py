@@ -0,0 +1,108 @@
+"""
+Camera for the grid view: which part of the grid the window shows, and
+how large a cell is on screen.
+
+Cells are drawn 'cell_size' pixels wide, taken from ZOOM_LEVELS. Levels
+below 1 show several cells per pixel; the renderer then samples every
+'step'-th cell instead of drawing them all, so drawing costs depend on the
+window size, not the grid size. The grid's origin sits at pixel (x, y) of
+the view, which may be negative once the view is zoomed in and panned. As
+everywhere in the visualizer, screen x follows the grid row.
+"""
+import math
+
+# Pixels per cell. Fractions are exact (1 / step) so sampling stays aligned.
+ZOOM_LEVELS = (1 / 16, 1 / 8, 1 / 4, 1 / 2, 1, 2, 3, 4, 6, 8, 10, 14, 20, 28, 40)
+
+
+class Camera:
+    """Zoom level and pan offset of a rows x cols grid in a width x height view."""
+
+    def __init__(self, rows, cols, width, height):
+        self.rows = rows
+        self.cols = cols
+        self.width = width
+        self.height = height
+        self.level = 0
+        self.x = 0  # Pixel position of the grid's top-left corner in the view
+        self.y = 0
+        # Bumped on every zoom or pan, so cached drawings can tell they are stale
+        self.version = 0
+        self.fit()
+
+    @property
+    def cell_size(self):
+        return ZOOM_LEVELS[self.level]
+
+    @property
+    def step(self):
+        """Cells per sampled pixel: 1 unless zoomed out below one pixel per cell."""
+        return max(1, round(1 / self.cell_size))
+
+    def fit(self):
+        """Largest zoom level that shows the whole grid, centered."""
+        self.level = 0
+        for level, size in enumerate(ZOOM_LEVELS):
+            if self.rows * size <= self.width and self.cols * size <= self.height:
+                self.level = level
+        size = self.cell_size
+        self.x = int(self.width - self.rows * size) // 2
+        self.y = int(self.height - self.cols * size) // 2
+        self._changed()
+
+    def zoom(self, levels, pixel=None):
+        """Zooms in (levels > 0) or out, keeping the cell under 'pixel' in place."""
+        level = max(0, min(len(ZOOM_LEVELS) - 1, self.level + levels))
+        if level == self.level:
+            return
+        pixel_x, pixel_y = pixel or (self.width // 2, self.height // 2)
+        scale = ZOOM_LEVELS[level] / self.cell_size
+        self.level = level
+        self.x = round(pixel_x - (pixel_x - self.x) * scale)
+        self.y = round(pixel_y - (pixel_y - self.y) * scale)
+        self._clamp()
+        self._changed()
+
+    def pan(self, dx, dy):
+        """Moves the view by (dx, dy) pixels; the grid moves the other way."""
+        self.x -= dx
+        self.y -= dy
+        self._clamp()
+        self._changed()
+
+    def _clamp(self):
+        # Keep at least a quarter of the view on the grid
+        grid_width, grid_height = self.rows * self.cell_size, self.cols * self.cell_size
+        self.x = int(max(self.width // 4 - grid_width, min(self.width * 3 // 4, self.x)))
+        self.y = int(max(self.height // 4 - grid_height, min(self.height * 3 // 4, self.y)))
+
+    def _changed(self):
+        self.version += 1
+
+    # --- Coordinates ---
+    def cell_at(self, pos):
+        """The (row, col) under a pixel, or None if the pixel is off the grid."""
+        row = math.floor((pos[0] - self.x) / self.cell_size)
+        col = math.floor((pos[1] - self.y) / self.cell_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def cell_origin(self, row, col):
+        """Pixel position of a cell's top-left corner."""
+        return self.x + row * self.cell_size, self.y + col * self.cell_size
+
+    def visible(self):
+        """
+        Visible cell range as (first_row, end_row, first_col, end_col), end
+        exclusive. When zoomed out the first row and col are multiples of
+        'step', so sampling picks the same cells as the view pans.
+        """
+        size, step = self.cell_size, self.step
+        first_row = max(0, math.floor(-self.x / size))
+        first_col = max(0, math.floor(-self.y / size))
+        first_row -= first_row % step
+        first_col -= first_col % step
+        end_row = min(self.rows, math.ceil((self.width - self.x) / size))
+        end_col = min(self.cols, math.ceil((self.height - self.y) / size))
+        return first_row, max(first_row, end_row), first_col, max(first_col, end_col)
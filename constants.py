@@ -15,4 +15,49 @@ GREY = (128, 128, 128)  # Grid Lines
 TURQUOISE = (64, 224, 208) # End Node
 ORANGE = (255, 165, 0)  # Start Node
 CYAN = (0, 255, 255)    # Current node in DFS/IDS/LDS
-LIGHT_GREY = (211, 211, 211) # Background for help/input box
\ No newline at end of file
+LIGHT_GREY = (211, 211, 211) # Background for help/input box
+PINK = (255, 105, 180)  # Closed Set of a reverse (goal-side) search
+
+# --- Terrain ---
+# Cost of entering a cell, one byte per cell in GridModel.costs
+DEFAULT_COST = 1
+MAX_COST = 9
+# Shade of an empty cell for each cost: white for cost 1, darker tan above
+TERRAIN_COLORS = tuple(
+    WHITE if cost <= DEFAULT_COST else
+    (255 - 12 * cost, 240 - 16 * cost, 200 - 18 * cost)
+    for cost in range(MAX_COST + 1))
+
+# --- Search Events ---
+# Solvers in algorithms.py yield (event, cell) pairs instead of drawing.
+EVENT_OPEN = 0     # Cell added to the frontier
+EVENT_CLOSED = 1   # Cell expanded
+EVENT_CURRENT = 2  # Cell on the active DFS/IDS/LDS branch
+EVENT_PATH = 3     # Cell on the final path
+EVENT_RESET = 4    # Clear all search colors (cell is None)
+EVENT_OPEN_REVERSE = 5    # Cell added to the goal-side frontier (bidirectional)
+EVENT_CLOSED_REVERSE = 6  # Cell expanded by the goal-side search
+EVENT_CLOSED_LAYER = 7    # A whole BFS layer expanded at once (cell is a list of indices)
+EVENT_SOLUTION = 8  # An anytime search published a better path (cell is its SearchResult)
+EVENT_FORGET = 9    # A memory-bounded search dropped a stored cell
+# Readable names, indexed by EVENT_* code (for traces and run statistics)
+EVENT_NAMES = ("open", "closed", "current", "path", "reset", "open_reverse",
+               "closed_reverse", "closed_layer", "solution", "forget")
+
+# --- Cell States ---
+# One byte per cell in GridModel.cells; STATE_COLORS maps each to its color.
+STATE_EMPTY = 0
+STATE_BARRIER = 1
+STATE_START = 2
+STATE_END = 3
+STATE_OPEN = 4
+STATE_CLOSED = 5
+STATE_PATH = 6
+STATE_CURRENT = 7
+STATE_OPEN_REVERSE = 8
+STATE_CLOSED_REVERSE = 9
+STATE_COLORS = (WHITE, BLACK, ORANGE, TURQUOISE, GREEN, RED, PURPLE, CYAN, YELLOW, PINK)
+# Cell state painted for each search event, indexed by EVENT_* code
+# (EVENT_RESET and EVENT_SOLUTION have no state of their own)
+EVENT_STATES = (STATE_OPEN, STATE_CLOSED, STATE_CURRENT, STATE_PATH, None,
+                STATE_OPEN_REVERSE, STATE_CLOSED_REVERSE, STATE_CLOSED, None, STATE_EMPTY)
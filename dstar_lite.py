@@ -0,0 +1,201 @@
+"""
+D* Lite incremental replanning (Koenig & Likhachev, 2002).
+
+The search runs backward from the goal and keeps, for every cell, its
+g-value and its one-step lookahead rhs = min over its neighbors of their
+g plus their terrain cost (the cost of stepping into them). Cells where
+the two disagree sit in the priority queue. Between queries the planner
+keeps all of that, so after barrier or cost edits only the cells around
+the edit are re-queued and the repair stays local. The start may
+move between queries (km absorbs the heuristic shift); a new goal starts
+a fresh planner.
+
+The first query seeds every reachable cell with its exact distance to the
+goal (one backward Dijkstra, a plain BFS on unit costs), which is a valid
+D* Lite state with an empty queue. Growing it key by key instead would
+settle the same cells far more slowly: the (k1, k2) keys break heuristic
+ties toward low g, so on open maps the plain initial search floods the
+whole plateau anyway.
+"""
+import weakref
+from constants import *
+from algorithms import SearchResult, emit_path, cost_order_list, h, UNSEEN
+from open_list import make_open_list
+
+# Keys are rounded to this many decimals. Diagonal costs are floats, so the
+# same key reached along two paths can differ in its last bits, and an exact
+# comparison with k(start) would end a repair while tied cells on the old
+# path are still queued.
+KEY_DIGITS = 9
+
+class DStarLite:
+    """Persistent D* Lite state for one GridModel and one goal cell."""
+
+    def __init__(self, grid, goal):
+        self.goal = goal
+        self.g = grid.new_array(grid.cost_typecode, UNSEEN)
+        self.rhs = grid.new_array(grid.cost_typecode, UNSEEN)
+        self.rhs[goal] = 0
+        self.open_set = make_open_list('heap')  # Priorities are (k1, k2) keys
+        self.km = 0  # Sum of heuristic shifts from start moves
+        self.last_start = None
+        self.pending = set()  # Cells whose walkability changed since the last query
+        self.stale = False  # Set when the whole grid was rebuilt or a query was cut short
+        grid.add_listener(self.on_change)
+
+    def on_change(self, cell):
+        """GridModel listener: remembers edited cells until the next query."""
+        if cell is None:
+            self.stale = True
+        else:
+            self.pending.add(cell)
+
+    def _key(self, grid, start, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return round(best + h(grid, start, cell) + self.km, KEY_DIGITS), round(best, KEY_DIGITS)
+
+    def _update_vertex(self, grid, start, cell):
+        """
+        Recomputes rhs(cell) and (re)queues the cell if it is inconsistent.
+        Returns True if the cell was not queued before.
+        """
+        g, rhs, open_set = self.g, self.rhs, self.open_set
+        if cell != self.goal:
+            rhs[cell] = self._best_step(grid, cell)
+        queued = cell in open_set
+        if g[cell] != rhs[cell]:
+            open_set.push(cell, self._key(grid, start, cell))
+            return not queued
+        if queued:
+            open_set.remove(cell)
+        return False
+
+    def _best_step(self, grid, cell):
+        """min(g + move cost) over the cell's neighbors: its distance via the best one."""
+        g = self.g
+        best = UNSEEN
+        for neighbor in grid.neighbors(cell):
+            if g[neighbor] != UNSEEN and g[neighbor] + grid.move_cost(cell, neighbor) < best:
+                best = g[neighbor] + grid.move_cost(cell, neighbor)
+        return best
+
+    def _around(self, grid, cell):
+        """
+        The cell and its in-bounds neighbors, whatever their walkability
+        (all 8 on an 8-connected grid, where the edit may also open or close
+        diagonal moves cutting past its corner).
+        """
+        row, col = divmod(cell, grid.cols)
+        reach = range(-1, 2)
+        cells = []
+        for dr in reach:
+            for dc in reach:
+                if (dr and dc and grid.connectivity == 4) \
+                        or not (0 <= row + dr < grid.rows and 0 <= col + dc < grid.cols):
+                    continue
+                cells.append(cell + dr * grid.cols + dc)
+        return cells
+
+    def _initialize(self, grid):
+        """Backward Dijkstra from the goal, leaving every reachable cell consistent."""
+        g, rhs = self.g, self.rhs
+        g[self.goal] = 0
+        queue = cost_order_list(grid)
+        queue.push(self.goal, 0)
+        while queue:
+            current = queue.pop()
+            for neighbor in grid.neighbors(current):
+                distance = g[current] + grid.move_cost(neighbor, current)  # Neighbors step into 'current'
+                if distance < g[neighbor]:
+                    if g[neighbor] == UNSEEN:
+                        yield EVENT_OPEN, neighbor
+                    g[neighbor] = rhs[neighbor] = distance
+                    queue.push(neighbor, distance)
+            yield EVENT_CLOSED, current
+
+    def search(self, grid, start):
+        """Repairs the previous solution (or builds the first one) and returns the path."""
+        expansions = 0
+        peak_open = 0
+        g, rhs, open_set = self.g, self.rhs, self.open_set
+        self.stale = True  # Until this query finishes; a stopped query leaves no usable state
+
+        if self.last_start is None:
+            self.last_start = start
+            for event in self._initialize(grid):
+                if event[0] == EVENT_CLOSED:
+                    expansions += 1
+                yield event
+            message = "D* Lite: initial search"
+        else:
+            if start != self.last_start:
+                self.km += h(grid, self.last_start, start)
+                self.last_start = start
+            message = f"D* Lite: repaired after {len(self.pending)} edited cell(s)"
+        for changed in self.pending:
+            for cell in self._around(grid, changed):
+                if self._update_vertex(grid, start, cell):
+                    yield EVENT_OPEN, cell
+        self.pending.clear()
+
+        while open_set:
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+            old_key = open_set.min_priority()
+            if old_key >= self._key(grid, start, start) and rhs[start] == g[start]:
+                break
+            current = open_set.pop()
+            expansions += 1
+
+            new_key = self._key(grid, start, current)
+            if old_key < new_key:  # Key went up since it was queued (start moved)
+                open_set.push(current, new_key)
+                continue
+            if g[current] > rhs[current]:  # Overconsistent: settle it
+                g[current] = rhs[current]
+            else:  # Underconsistent: its old g is no longer reachable
+                g[current] = UNSEEN
+                self._update_vertex(grid, start, current)
+            for neighbor in grid.neighbors(current):
+                if self._update_vertex(grid, start, neighbor):
+                    yield EVENT_OPEN, neighbor
+
+            yield EVENT_CLOSED, current
+
+        self.stale = False
+        if g[start] == UNSEEN:
+            return SearchResult(False, expansions=expansions, peak_open=peak_open, message=message)
+
+        # Walk downhill in g + move cost from start; every step lies on a cheapest path
+        path = [start]
+        cell = start
+        while cell != self.goal:
+            cell = min(grid.neighbors(cell), key=lambda neighbor: g[neighbor] + grid.move_cost(cell, neighbor))
+            path.append(cell)
+            if g[cell] == UNSEEN or len(path) > grid.size:
+                print("Error: D* Lite path extraction failed.")
+                return SearchResult(False, expansions=expansions, peak_open=peak_open, message=message)
+        yield from emit_path(path)
+        return SearchResult(True, path, expansions, peak_open=peak_open, message=message, cost=g[start])
+
+
+# One planner per GridModel, kept while the goal stays the same. Planners
+# don't hold on to their grid, so the cache entry goes away with the model.
+_planners = weakref.WeakKeyDictionary()
+
+def planner_for(grid, goal):
+    """Returns the grid's D* Lite planner for 'goal', starting a new one if needed."""
+    planner = _planners.get(grid)
+    if planner is None or planner.goal != goal or planner.stale:
+        if planner is not None:
+            grid.remove_listener(planner.on_change)
+        planner = DStarLite(grid, goal)
+        _planners[grid] = planner
+    return planner
+
+def d_star_lite(grid, start, end):
+    """
+    D* Lite from start to end. The planner state survives between calls on
+    the same grid and goal, so replanning after edits or start moves is cheap.
+    """
+    return (yield from planner_for(grid, end).search(grid, start))
@@ -0,0 +1,139 @@
+"""
+Flow fields: one search per goal, any number of agents.
+
+A reverse Dijkstra from the goal settles every reachable cell (terrain
+costs included) and records, for each, the link bit of its next step
+toward the goal. An agent anywhere on the grid then follows those
+directions to the goal in O(path length), with no search of its own.
+Fields are cached per grid and goal and are rebuilt once the grid version
+moves on (i.e. after a barrier or cost edit).
+"""
+import weakref
+from collections import OrderedDict
+from constants import *
+from algorithms import SearchResult, emit_path, cost_order_list, UNSEEN
+
+NO_DIRECTION = 0  # Goal cell, or a cell that cannot reach the goal
+MAX_FIELDS_PER_GRID = 8
+
+
+class FlowField:
+    """Next-step directions toward one goal on one version of a GridModel."""
+
+    def __init__(self, grid, goal):
+        self.goal = goal
+        self.version = grid.version
+        self.distance = grid.new_array(grid.cost_typecode, UNSEEN)  # Cost of the route to the goal
+        self.direction = bytearray(grid.size)  # Link bit of the next step, per cell
+        self.complete = False
+
+    def build(self, grid):
+        """
+        Generator running the reverse Dijkstra. Yields search events and
+        returns the number of cells expanded; the field is usable once
+        'complete' is set.
+        """
+        expansions = 0
+        distance, direction = self.distance, self.direction
+        # Link bit that leads back from a neighbor to the cell it was reached from
+        toward = {-offset: bit for bit, offset in grid.link_offsets.items()}
+        open_set = cost_order_list(grid)
+        open_set.push(self.goal, 0, 0)
+        distance[self.goal] = 0
+
+        while open_set:
+            current = open_set.pop()
+            expansions += 1
+            # Neighbors step into 'current', so they pay its cost
+            for neighbor, step in grid.moves(current, reverse=True):
+                temp_distance = distance[current] + step
+                if temp_distance < distance[neighbor]:
+                    if distance[neighbor] == UNSEEN:
+                        yield EVENT_OPEN, neighbor
+                    distance[neighbor] = temp_distance
+                    direction[neighbor] = toward[neighbor - current]
+                    open_set.push(neighbor, temp_distance, temp_distance)
+            yield EVENT_CLOSED, current
+
+        self.complete = True
+        return expansions
+
+    def is_current(self, grid):
+        return self.complete and self.version == grid.version
+
+    def route(self, grid, start):
+        """Path start -> goal read off the field, or None if start cannot reach the goal."""
+        if self.distance[start] == UNSEEN:
+            return None
+        offsets = grid.link_offsets
+        direction = self.direction
+        path = [start]
+        cell = start
+        while cell != self.goal:
+            cell += offsets[direction[cell]]
+            path.append(cell)
+        return path
+
+
+# --- Cache ---
+# Per GridModel, the most recently used fields by goal. A field built on an
+# older grid version is dropped when it is next looked up.
+_fields = weakref.WeakKeyDictionary()
+
+def cached_field(grid, goal):
+    """The grid's finished field for 'goal' if it is still current, else None."""
+    fields = _fields.get(grid)
+    if fields is None or goal not in fields:
+        return None
+    field = fields[goal]
+    if not field.is_current(grid):
+        del fields[goal]
+        return None
+    fields.move_to_end(goal)
+    return field
+
+def _store(grid, field):
+    fields = _fields.get(grid)
+    if fields is None:
+        fields = _fields[grid] = OrderedDict()
+    fields[field.goal] = field
+    fields.move_to_end(field.goal)
+    while len(fields) > MAX_FIELDS_PER_GRID:
+        fields.popitem(last=False)
+
+def field_for(grid, goal):
+    """Returns a current field for 'goal', building it (without events) if needed."""
+    field = cached_field(grid, goal)
+    if field is None:
+        field = FlowField(grid, goal)
+        for _ in field.build(grid):
+            pass
+        _store(grid, field)
+    return field
+
+def routes(grid, starts, goal):
+    """Paths from every start to 'goal' (None where unreachable) off one shared field."""
+    field = field_for(grid, goal)
+    return [field.route(grid, start) for start in starts]
+
+
+def flow_field(grid, start, end):
+    """
+    Routes start -> end through the goal's flow field. Only the first query
+    toward a goal (per grid version) searches; later ones just follow it.
+    """
+    expansions = 0
+    field = cached_field(grid, end)
+    if field is None:
+        field = FlowField(grid, end)
+        expansions = yield from field.build(grid)
+        _store(grid, field)
+        message = f"Flow field: built for the goal ({expansions} cells)"
+    else:
+        message = "Flow field: reused, no search needed"
+
+    path = field.route(grid, start)
+    if path is None:
+        return SearchResult(False, expansions=expansions, message=message)
+    yield from emit_path(path)
+    return SearchResult(True, path, expansions, message=message, cost=field.distance[start])
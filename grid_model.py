@@ -0,0 +1,353 @@
+from array import array
+from contextlib import contextmanager
+from constants import *
+
+# Translation table that turns every search state back into STATE_EMPTY.
+_CLEAR_SEARCH = bytes(
+    STATE_EMPTY if state in (STATE_OPEN, STATE_CLOSED, STATE_PATH, STATE_CURRENT,
+                             STATE_OPEN_REVERSE, STATE_CLOSED_REVERSE) else state
+    for state in range(256))
+# Translation table giving 1 for walkable cells and 0 for barriers.
+_WALKABLE = bytes(0 if state == STATE_BARRIER else 1 for state in range(256))
+
+# --- Adjacency Links ---
+# links[index] is a bit mask of the walkable moves out of a cell. It is kept
+# up to date as barriers are placed or erased, so searches never rebuild it.
+LINK_DOWN = 1   # row + 1
+LINK_UP = 2     # row - 1
+LINK_RIGHT = 4  # col + 1
+LINK_LEFT = 8   # col - 1
+LINK_DIRECTIONS = (LINK_DOWN, LINK_UP, LINK_RIGHT, LINK_LEFT)  # Neighbor order
+# Diagonal moves, used on 8-connected grids (neighbors after the straight ones)
+LINK_DOWN_RIGHT = 16  # row + 1, col + 1
+LINK_DOWN_LEFT = 32   # row + 1, col - 1
+LINK_UP_RIGHT = 64    # row - 1, col + 1
+LINK_UP_LEFT = 128    # row - 1, col - 1
+LINK_DIAGONALS = (LINK_DOWN_RIGHT, LINK_DOWN_LEFT, LINK_UP_RIGHT, LINK_UP_LEFT)
+LINK_DELTAS = {LINK_DOWN: (1, 0), LINK_UP: (-1, 0), LINK_RIGHT: (0, 1), LINK_LEFT: (0, -1),
+               LINK_DOWN_RIGHT: (1, 1), LINK_DOWN_LEFT: (1, -1),
+               LINK_UP_RIGHT: (-1, 1), LINK_UP_LEFT: (-1, -1)}  # (row, col) step of each bit
+
+# --- Connectivity ---
+CONNECTIVITIES = (4, 8)
+# When a diagonal move may pass a barrier on one of the two cells beside it:
+# 'never' needs both open (no corner cutting), 'one' needs at least one open
+# (no squeezing between two barriers) and 'always' only looks at the target.
+CORNER_CUTTING = ('never', 'one', 'always')
+DIAGONAL_COST = 2 ** 0.5  # A diagonal move costs this times the entered cell's cost
+
+# --- Search Workspaces ---
+MAX_GENERATION = 2 ** 32 - 1  # Largest stamp an 'I' array holds
+IDLE_WORKSPACES = 2  # Workspaces a grid keeps between searches
+
+
+class SearchWorkspace:
+    """
+    Per-cell parent and cost arrays that are reused from one search to the
+    next instead of being allocated and filled for each. A cell's entries
+    are only valid while stamp[cell] == generation, and begin() moves to a
+    new generation, so everything earlier searches left behind reads as
+    unvisited without a sweep over the grid.
+    """
+
+    def __init__(self, size, cost_typecode):
+        self.stamp = array('I', [0]) * size
+        self.generation = 0
+        self.parent = array('i', [0]) * size
+        self.cost = array(cost_typecode, [0]) * size
+
+    def begin(self):
+        """Starts a new search: every cell becomes unvisited."""
+        if self.generation == MAX_GENERATION:
+            self.stamp = array('I', [0]) * len(self.stamp)
+            self.generation = 0
+        self.generation += 1
+
+
+class GridModel:
+    """
+    Pygame-free, array-backed grid that the search algorithms run on.
+    Each cell is one byte in 'cells' holding a STATE_* code and one byte in
+    'costs' holding the cost of entering it (DEFAULT_COST..MAX_COST), and
+    cells are addressed by a flat integer index (row * cols + col). Moves
+    are 4-connected, or 8-connected with a corner-cutting policy.
+    """
+
+    def __init__(self, rows, cols=None, cells=None, links=None, costs=None,
+                 connectivity=4, corner_cutting='never'):
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        self.size = self.rows * self.cols
+        # Existing buffers (e.g. shared memory) are wrapped without copying
+        self.cells = bytearray(self.size) if cells is None else cells
+        self.links = bytearray(self.size) if links is None else links
+        self.costs = bytearray([DEFAULT_COST]) * self.size if costs is None else costs
+        # Cells costing more than DEFAULT_COST; searches that assume unit
+        # costs check this before running.
+        self.weighted_cells = 0 if costs is None else self.size - bytes(costs).count(DEFAULT_COST)
+        # Bumped on every walkability or cost change, so results computed
+        # on an older version of the grid can be recognised as stale.
+        self.version = 0
+        # Callbacks told about walkability and cost changes: listener(index)
+        # after a single cell changes, listener(None) after rebuild_links().
+        self.listeners = []
+        self._set_connectivity(connectivity, corner_cutting)
+        if links is None:
+            self.rebuild_links()
+        # Change tracking for renderers: indices of cells whose state changed
+        # since the last repaint. None until a renderer calls track_changes().
+        self.changed = None
+        self.all_changed = False
+        self._workspaces = []  # Idle SearchWorkspaces, see workspace()
+        self._walkable = None  # (version, walkable_bytes()) once asked for
+
+    def _set_connectivity(self, connectivity, corner_cutting):
+        if connectivity not in CONNECTIVITIES:
+            raise ValueError(f"Unknown connectivity {connectivity} (expected one of {CONNECTIVITIES})")
+        if corner_cutting not in CORNER_CUTTING:
+            raise ValueError(f"Unknown corner-cutting policy '{corner_cutting}' (expected one of {CORNER_CUTTING})")
+        if connectivity == 8 and self.cols < 3:
+            # Diagonal and straight index offsets would coincide
+            raise ValueError("8-connectivity needs a grid at least 3 columns wide")
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        directions = LINK_DIRECTIONS + (LINK_DIAGONALS if connectivity == 8 else ())
+        # Index offset for each link bit, and the offsets for every mask
+        self.link_offsets = {bit: LINK_DELTAS[bit][0] * self.cols + LINK_DELTAS[bit][1]
+                             for bit in directions}
+        self.steps = tuple(
+            tuple(self.link_offsets[bit] for bit in directions if mask & bit)
+            for mask in range(1 << len(directions)))
+        # Searches test 'neighbor - cell in diagonal_offsets' to price a move
+        self.diagonal_offsets = frozenset(self.link_offsets[bit] for bit in LINK_DIAGONALS
+                                          if bit in self.link_offsets)
+        # Path costs are whole numbers unless diagonal moves cost DIAGONAL_COST
+        self.cost_typecode = 'd' if connectivity == 8 else 'i'
+
+    def set_connectivity(self, connectivity, corner_cutting='never'):
+        """Switches between 4- and 8-connected moves and relinks the grid."""
+        self._set_connectivity(connectivity, corner_cutting)
+        self.rebuild_links()
+
+    def move_cost(self, index, neighbor):
+        """Cost of the move index -> neighbor: the entered cell's cost, scaled on diagonals."""
+        if neighbor - index in self.diagonal_offsets:
+            return self.costs[neighbor] * DIAGONAL_COST
+        return self.costs[neighbor]
+
+    def moves(self, index, reverse=False):
+        """
+        (neighbor, cost) for every walkable neighbor, in neighbors() order,
+        priced like move_cost(): the cost of index -> neighbor, or with
+        'reverse' of neighbor -> index (for searches grown from the goal).
+        Searches price a whole expansion with one call rather than calling
+        move_cost() per neighbor in their inner loops.
+        """
+        costs, diagonal = self.costs, self.diagonal_offsets
+        steps = self.steps[self.links[index]]
+        if reverse:
+            cost = costs[index]
+            if not diagonal:
+                return [(index + step, cost) for step in steps]
+            return [(index + step, cost * DIAGONAL_COST if step in diagonal else cost) for step in steps]
+        if not diagonal:
+            return [(index + step, costs[index + step]) for step in steps]
+        return [(index + step, costs[index + step] * DIAGONAL_COST if step in diagonal else costs[index + step])
+                for step in steps]
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def pos(self, index):
+        """Returns the (row, col) of a cell index."""
+        return divmod(index, self.cols)
+
+    def state(self, index):
+        return self.cells[index]
+
+    def set_state(self, index, state):
+        was_barrier = self.cells[index] == STATE_BARRIER
+        self.cells[index] = state
+        if was_barrier != (state == STATE_BARRIER):
+            self._update_links(index)
+            self.version += 1
+            for listener in self.listeners:
+                listener(index)
+        if self.changed is not None:
+            self.changed.add(index)
+
+    def cost(self, index):
+        return self.costs[index]
+
+    def set_cost(self, index, cost):
+        """Sets the cost of entering a cell; listeners hear about it like a barrier edit."""
+        if not DEFAULT_COST <= cost <= MAX_COST:
+            raise ValueError(f"Terrain cost must be between {DEFAULT_COST} and {MAX_COST}, not {cost}")
+        old = self.costs[index]
+        if old == cost:
+            return
+        self.costs[index] = cost
+        self.weighted_cells += (cost != DEFAULT_COST) - (old != DEFAULT_COST)
+        self.version += 1
+        for listener in self.listeners:
+            listener(index)
+        if self.changed is not None:
+            self.changed.add(index)
+
+    @property
+    def weighted(self):
+        """True if any cell costs more than DEFAULT_COST to enter."""
+        return self.weighted_cells > 0
+
+    def walkable_bytes(self):
+        """
+        One byte per cell: 1 if it is walkable, 0 for a barrier. Kept until
+        the grid's version changes, so searches after the first get it free.
+        """
+        if self._walkable is None or self._walkable[0] != self.version:
+            # bytes() first: batch workers hold cells as a read-only memoryview
+            self._walkable = (self.version, bytes(self.cells).translate(_WALKABLE))
+        return self._walkable[1]
+
+    def track_changes(self):
+        """Starts recording changed cells for a renderer."""
+        self.changed = set()
+        self.all_changed = True
+
+    def add_listener(self, listener):
+        """Registers a callback for walkability changes (see 'listeners')."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def is_barrier(self, index):
+        return self.cells[index] == STATE_BARRIER
+
+    def neighbors(self, index):
+        """
+        Walkable neighbors, in Down, Up, Right, Left order followed on an
+        8-connected grid by Down-Right, Down-Left, Up-Right, Up-Left.
+        """
+        return [index + step for step in self.steps[self.links[index]]]
+
+    def _link_mask(self, index):
+        """Computes a cell's link mask from the barriers around it."""
+        cells = self.cells
+        if cells[index] == STATE_BARRIER:
+            return 0
+        cols = self.cols
+        row, col = divmod(index, cols)
+        mask = 0
+        if row < self.rows - 1 and cells[index + cols] != STATE_BARRIER:
+            mask |= LINK_DOWN
+        if row > 0 and cells[index - cols] != STATE_BARRIER:
+            mask |= LINK_UP
+        if col < cols - 1 and cells[index + 1] != STATE_BARRIER:
+            mask |= LINK_RIGHT
+        if col > 0 and cells[index - 1] != STATE_BARRIER:
+            mask |= LINK_LEFT
+        if self.connectivity == 8:
+            for bit in LINK_DIAGONALS:
+                dr, dc = LINK_DELTAS[bit]
+                if not (0 <= row + dr < self.rows and 0 <= col + dc < cols) \
+                        or cells[index + dr * cols + dc] == STATE_BARRIER:
+                    continue
+                beside = (cells[index + dr * cols] != STATE_BARRIER) + (cells[index + dc] != STATE_BARRIER)
+                if self.corner_cutting == 'always' or beside == 2 or (beside == 1 and self.corner_cutting == 'one'):
+                    mask |= bit
+        return mask
+
+    def _update_links(self, index):
+        """Refreshes the links of a cell whose barrier state flipped, and of its neighbors."""
+        links = self.links
+        links[index] = self._link_mask(index)
+        cols = self.cols
+        row, col = divmod(index, cols)
+        for neighbor, inside in ((index + cols, row < self.rows - 1), (index - cols, row > 0),
+                                 (index + 1, col < cols - 1), (index - 1, col > 0)):
+            if inside:
+                links[neighbor] = self._link_mask(neighbor)
+        if self.connectivity == 8:
+            # Diagonal cells link to this one, or cut past its corner
+            for bit in LINK_DIAGONALS:
+                dr, dc = LINK_DELTAS[bit]
+                if 0 <= row + dr < self.rows and 0 <= col + dc < cols:
+                    neighbor = index + dr * cols + dc
+                    links[neighbor] = self._link_mask(neighbor)
+
+    def rebuild_links(self):
+        """
+        Recomputes every link from scratch, e.g. after bulk edits of 'cells'.
+        Each link direction is computed for the whole grid at once by treating
+        the byte arrays as big integers (one 0/1 byte per cell) and shifting
+        them by a row and/or a column, so this stays fast on very large grids.
+        """
+        size = self.size
+        cols = self.cols
+        all_cells = (1 << (8 * size)) - 1
+        walk = int.from_bytes(bytes(self.cells).translate(_WALKABLE), 'little')
+        not_last_col = int.from_bytes(((b'\x01' * (cols - 1)) + b'\x00') * self.rows, 'little')
+        not_first_col = int.from_bytes((b'\x00' + (b'\x01' * (cols - 1))) * self.rows, 'little')
+        below = walk >> (8 * cols)
+        above = walk << (8 * cols)
+        east = (walk >> 8) & not_last_col
+        west = (walk << 8) & not_first_col
+        links = ((walk & below) * LINK_DOWN) | ((walk & above) * LINK_UP) \
+            | ((walk & east) * LINK_RIGHT) | ((walk & west) * LINK_LEFT)
+        if self.connectivity == 8:
+            if self.corner_cutting == 'never':
+                corner = lambda side, other_side: side & other_side
+            elif self.corner_cutting == 'one':
+                corner = lambda side, other_side: side | other_side
+            else:
+                corner = lambda side, other_side: all_cells
+            down_right = (walk >> (8 * (cols + 1))) & not_last_col & corner(below, east)
+            down_left = (walk >> (8 * (cols - 1))) & not_first_col & corner(below, west)
+            up_right = (walk << (8 * (cols - 1))) & not_last_col & corner(above, east)
+            up_left = (walk << (8 * (cols + 1))) & not_first_col & corner(above, west)
+            links |= ((walk & down_right) * LINK_DOWN_RIGHT) | ((walk & down_left) * LINK_DOWN_LEFT) \
+                | ((walk & up_right) * LINK_UP_RIGHT) | ((walk & up_left) * LINK_UP_LEFT)
+        self.links[:] = (links & all_cells).to_bytes(size, 'little')
+        self.version += 1
+        for listener in self.listeners:
+            listener(None)
+
+    def clear(self):
+        """Resets every cell to empty, with the default cost."""
+        self.cells[:] = bytes(self.size)
+        self.costs[:] = bytes([DEFAULT_COST]) * self.size
+        self.weighted_cells = 0
+        self.rebuild_links()
+        self.all_changed = True
+
+    def reset_search(self):
+        """Turns open/closed/path/current cells back into empty ones."""
+        self.cells[:] = self.cells.translate(_CLEAR_SEARCH)
+        self.all_changed = True
+
+    def new_array(self, typecode, fill):
+        """Allocates a per-cell search array (e.g. parents or g-costs)."""
+        return array(typecode, [fill]) * self.size
+
+    @contextmanager
+    def workspace(self):
+        """
+        Lends a SearchWorkspace, on a fresh generation, for the length of a
+        with block. It is kept for the next search afterwards, also when a
+        search generator is closed early, so only the first search on a
+        grid pays for allocating per-cell arrays.
+        """
+        typecode = self.cost_typecode
+        for i, work in enumerate(self._workspaces):
+            if work.cost.typecode == typecode:
+                del self._workspaces[i]
+                break
+        else:
+            work = SearchWorkspace(self.size, typecode)
+        work.begin()
+        try:
+            yield work
+        finally:
+            self._workspaces.append(work)
+            del self._workspaces[:-IDLE_WORKSPACES]
@@ -0,0 +1,82 @@
+"""
+Heuristic registry for the informed searches.
+
+Every heuristic takes (grid, a, b) with a and b cell indices and estimates
+the cost of moving from a to b. Which ones are admissible depends on the
+grid's connectivity: Manhattan overestimates once diagonal moves exist,
+while the others never do. Terrain costs are at least DEFAULT_COST, so
+none of them can overestimate because of terrain.
+"""
+from grid_model import DIAGONAL_COST
+
+_DIAGONAL_EXTRA = DIAGONAL_COST - 1
+
+
+def manhattan(grid, a, b):
+    """Exact move cost on an open 4-connected grid."""
+    x1, y1 = divmod(a, grid.cols)
+    x2, y2 = divmod(b, grid.cols)
+    return abs(x1 - x2) + abs(y1 - y2)
+
+def octile(grid, a, b):
+    """Exact move cost on an open 8-connected grid: diagonals, then straight."""
+    x1, y1 = divmod(a, grid.cols)
+    x2, y2 = divmod(b, grid.cols)
+    dx, dy = abs(x1 - x2), abs(y1 - y2)
+    return max(dx, dy) + _DIAGONAL_EXTRA * min(dx, dy)
+
+def chebyshev(grid, a, b):
+    """Fewest moves on an 8-connected grid, ignoring that diagonals cost more."""
+    x1, y1 = divmod(a, grid.cols)
+    x2, y2 = divmod(b, grid.cols)
+    return max(abs(x1 - x2), abs(y1 - y2))
+
+def euclidean(grid, a, b):
+    """Straight-line distance; admissible for any connectivity, rarely tight."""
+    x1, y1 = divmod(a, grid.cols)
+    x2, y2 = divmod(b, grid.cols)
+    return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
+
+def zero(grid, a, b):
+    """No estimate at all: A* becomes Dijkstra."""
+    return 0
+
+
+HEURISTICS = {
+    'manhattan': manhattan,
+    'octile': octile,
+    'chebyshev': chebyshev,
+    'euclidean': euclidean,
+    'zero': zero,
+}
+# Admissible heuristics per connectivity, tightest first
+ADMISSIBLE = {
+    4: ('manhattan', 'octile', 'euclidean', 'chebyshev', 'zero'),
+    8: ('octile', 'euclidean', 'chebyshev', 'zero'),
+}
+
+
+def default_name(grid):
+    """The tightest admissible heuristic for the grid's connectivity."""
+    return ADMISSIBLE[grid.connectivity][0]
+
+def resolve(grid, name=None):
+    """
+    Returns the heuristic function called 'name', or the grid's default if
+    name is None. Raises ValueError for a heuristic that could overestimate
+    on this grid, since A* would then no longer return shortest paths.
+    """
+    if name is None:
+        name = default_name(grid)
+    if name not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic '{name}' (expected one of {tuple(HEURISTICS)})")
+    if name not in ADMISSIBLE[grid.connectivity]:
+        raise ValueError(f"Heuristic '{name}' is not admissible on a {grid.connectivity}-connected grid "
+                         f"(use one of {ADMISSIBLE[grid.connectivity]})")
+    return HEURISTICS[name]
+
+def min_moves(grid, a, b):
+    """Lower bound on the number of moves from a to b (for depth limits)."""
+    if grid.connectivity == 8:
+        return chebyshev(grid, a, b)
+    return manhattan(grid, a, b)
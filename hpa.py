@@ -0,0 +1,278 @@
+"""
+Hierarchical pathfinding (HPA*) for large grids.
+
+The grid is split into square clusters. Where two clusters touch, every
+run of cells that is open on both sides becomes an entrance, and the cells
+of an entrance are the nodes of a small abstract graph:
+- inter edges (cost 1) cross a cluster border;
+- intra edges join the entrances of one cluster, weighted by their BFS
+  distance inside that cluster.
+A query links start and end into that graph, runs A* over it and then
+refines each abstract edge into cells with a search confined to a cluster.
+
+Clusters are built lazily, the first time a query reaches them, and the
+planner listens to the GridModel: a barrier edit only discards the cluster
+it is in (plus the neighbor across a border it sits on). Paths are
+near-optimal, typically within a few percent of a_star.
+"""
+import weakref
+from collections import deque
+from constants import *
+from algorithms import SearchResult, emit_path, h, a_star, NO_PARENT, UNSEEN
+from open_list import make_open_list
+
+DEFAULT_CLUSTER_SIZE = 16
+WIDE_ENTRANCE = 6  # Entrances at least this wide get a transition at both ends
+
+
+class ClusterGraph:
+    """Abstract graph of one GridModel, kept up to date through its listeners."""
+
+    def __init__(self, grid, cluster_size=DEFAULT_CLUSTER_SIZE):
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-self.rows // cluster_size)
+        self.cluster_cols = -(-self.cols // cluster_size)
+        # Missing entries are (re)built on demand
+        self.transitions = {}  # Border -> [(cell, cell across the border)]
+        self.partners = {}  # Cluster -> {entrance cell: [cells across borders]}
+        self.intra = {}  # Cluster -> {entrance cell: {other entrance: distance}}
+        self.builds = 0  # Clusters built so far, for tests and benchmarks
+        grid.add_listener(self.on_change)
+
+    # --- Invalidation ---
+    def on_change(self, cell):
+        """GridModel listener: forgets the parts of the graph an edit touched."""
+        if cell is None:
+            self.transitions.clear()
+            self.partners.clear()
+            self.intra.clear()
+            return
+        size = self.cluster_size
+        row, col = divmod(cell, self.cols)
+        cluster_row, cluster_col = row // size, col // size
+        self._forget((cluster_row, cluster_col))
+        # Cells on a border also change the entrances of the cluster across it
+        if row % size == 0 and cluster_row > 0:
+            self.transitions.pop(('h', cluster_row - 1, cluster_col), None)
+            self._forget((cluster_row - 1, cluster_col))
+        if row % size == size - 1 and cluster_row < self.cluster_rows - 1:
+            self.transitions.pop(('h', cluster_row, cluster_col), None)
+            self._forget((cluster_row + 1, cluster_col))
+        if col % size == 0 and cluster_col > 0:
+            self.transitions.pop(('v', cluster_row, cluster_col - 1), None)
+            self._forget((cluster_row, cluster_col - 1))
+        if col % size == size - 1 and cluster_col < self.cluster_cols - 1:
+            self.transitions.pop(('v', cluster_row, cluster_col), None)
+            self._forget((cluster_row, cluster_col + 1))
+
+    def _forget(self, cluster):
+        self.partners.pop(cluster, None)
+        self.intra.pop(cluster, None)
+
+    # --- Clusters and Borders ---
+    def cluster_of(self, cell):
+        row, col = divmod(cell, self.cols)
+        return row // self.cluster_size, col // self.cluster_size
+
+    def _bounds(self, cluster):
+        """(top, left, bottom, right) of a cluster; bottom and right are exclusive."""
+        size = self.cluster_size
+        top, left = cluster[0] * size, cluster[1] * size
+        return top, left, min(self.rows, top + size), min(self.cols, left + size)
+
+    def _borders(self, cluster):
+        """Borders of a cluster. ('h', r, c) lies below cluster (r, c), ('v', r, c) right of it."""
+        cluster_row, cluster_col = cluster
+        borders = []
+        if cluster_row > 0:
+            borders.append(('h', cluster_row - 1, cluster_col))
+        if cluster_row < self.cluster_rows - 1:
+            borders.append(('h', cluster_row, cluster_col))
+        if cluster_col > 0:
+            borders.append(('v', cluster_row, cluster_col - 1))
+        if cluster_col < self.cluster_cols - 1:
+            borders.append(('v', cluster_row, cluster_col))
+        return borders
+
+    def _border_transitions(self, grid, border):
+        """One transition per narrow entrance along a border, two per wide one."""
+        transitions = self.transitions.get(border)
+        if transitions is not None:
+            return transitions
+        kind, cluster_row, cluster_col = border
+        top, left, bottom, right = self._bounds((cluster_row, cluster_col))
+        cols = self.cols
+        if kind == 'h':
+            pairs = [((bottom - 1) * cols + col, bottom * cols + col) for col in range(left, right)]
+        else:
+            pairs = [(row * cols + right - 1, row * cols + right) for row in range(top, bottom)]
+        cells = grid.cells
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and cells[a] != STATE_BARRIER and cells[b] != STATE_BARRIER:
+                run.append((a, b))
+                continue
+            if len(run) >= WIDE_ENTRANCE:
+                transitions.append(run[0])
+                transitions.append(run[-1])
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        self.transitions[border] = transitions
+        return transitions
+
+    def _cluster_bfs(self, grid, source, cluster):
+        """Distances and parents from 'source' to the cells of its cluster, moving inside it."""
+        top, left, bottom, right = self._bounds(cluster)
+        cols = self.cols
+        distance = {source: 0}
+        came_from = {source: NO_PARENT}
+        queue = deque([source])
+        while queue:
+            cell = queue.popleft()
+            next_distance = distance[cell] + 1
+            for neighbor in grid.neighbors(cell):
+                if neighbor not in distance:
+                    row, col = divmod(neighbor, cols)
+                    if top <= row < bottom and left <= col < right:
+                        distance[neighbor] = next_distance
+                        came_from[neighbor] = cell
+                        queue.append(neighbor)
+        return distance, came_from
+
+    def _cluster(self, grid, cluster):
+        """Returns (partners, intra) for a cluster, building it if needed."""
+        partners = self.partners.get(cluster)
+        if partners is not None:
+            return partners, self.intra[cluster]
+        partners = {}
+        for border in self._borders(cluster):
+            for a, b in self._border_transitions(grid, border):
+                if self.cluster_of(a) == cluster:
+                    partners.setdefault(a, []).append(b)
+                else:
+                    partners.setdefault(b, []).append(a)
+        intra = {}
+        for entrance in partners:
+            distance, _ = self._cluster_bfs(grid, entrance, cluster)
+            intra[entrance] = {other: distance[other] for other in partners
+                               if other != entrance and other in distance}
+        self.partners[cluster] = partners
+        self.intra[cluster] = intra
+        self.builds += 1
+        return partners, intra
+
+    # --- Queries ---
+    def _refine(self, grid, abstract_path):
+        """Turns consecutive abstract nodes into a cell path."""
+        path = abstract_path[:1]
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(a)
+            if cluster != self.cluster_of(b):
+                path.append(b)  # Inter edge: the two cells are adjacent
+                continue
+            _, came_from = self._cluster_bfs(grid, a, cluster)
+            segment = []
+            cell = b
+            while cell != a:
+                segment.append(cell)
+                cell = came_from[cell]
+            segment.reverse()
+            path.extend(segment)
+        return path
+
+    def search(self, grid, start, end):
+        """A* over the abstract graph with start and end linked in; see hpa_star()."""
+        expansions = 0
+        peak_open = 0
+        pushes = 1
+        if start == end:
+            return SearchResult(True, [start])
+
+        start_cluster, end_cluster = self.cluster_of(start), self.cluster_of(end)
+        start_partners, _ = self._cluster(grid, start_cluster)
+        end_partners, _ = self._cluster(grid, end_cluster)
+        start_distance, _ = self._cluster_bfs(grid, start, start_cluster)
+        end_distance, _ = self._cluster_bfs(grid, end, end_cluster)
+        start_edges = {entrance: start_distance[entrance]
+                       for entrance in start_partners if entrance in start_distance}
+        if start_cluster == end_cluster and end in start_distance:
+            start_edges[end] = start_distance[end]
+        end_edges = {entrance: end_distance[entrance]
+                     for entrance in end_partners if entrance in end_distance}
+
+        open_set = make_open_list('heap', 'high_g')
+        open_set.push(start, h(grid, start, end), 0)
+        came_from = {start: NO_PARENT}
+        g_score = {start: 0}
+
+        while open_set:
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+            current = open_set.pop()
+            expansions += 1
+
+            if current == end:
+                abstract_path = [end]
+                while abstract_path[-1] != start:
+                    abstract_path.append(came_from[abstract_path[-1]])
+                abstract_path.reverse()
+                path = self._refine(grid, abstract_path)
+                yield from emit_path(path)
+                return SearchResult(True, path, expansions, peak_open=peak_open, pushes=pushes,
+                                    message=f"HPA*: {len(abstract_path)} abstract nodes, "
+                                            f"{len(self.partners)} clusters built")
+
+            partners, intra = self._cluster(grid, self.cluster_of(current))
+            edges = list(intra.get(current, {}).items())
+            edges.extend((partner, 1) for partner in partners.get(current, ()))
+            if current == start:
+                edges.extend(start_edges.items())
+            if current in end_edges:
+                edges.append((end, end_edges[current]))
+
+            for neighbor, cost in edges:
+                temp_g_score = g_score[current] + cost
+                if temp_g_score < g_score.get(neighbor, UNSEEN):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = temp_g_score
+                    queued = neighbor in open_set
+                    open_set.push(neighbor, temp_g_score + h(grid, neighbor, end), temp_g_score)
+                    pushes += 1
+                    if not queued:
+                        yield EVENT_OPEN, neighbor
+
+            yield EVENT_CLOSED, current
+
+        return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes)
+
+
+# One planner per GridModel. Planners don't hold on to their grid, so the
+# cache entry goes away together with the model.
+_planners = weakref.WeakKeyDictionary()
+
+def planner_for(grid, cluster_size=DEFAULT_CLUSTER_SIZE):
+    """Returns the grid's ClusterGraph, creating it on first use."""
+    planner = _planners.get(grid)
+    if planner is None or planner.cluster_size != cluster_size:
+        if planner is not None:
+            grid.remove_listener(planner.on_change)
+        planner = ClusterGraph(grid, cluster_size)
+        _planners[grid] = planner
+    return planner
+
+def hpa_star(grid, start, end, cluster_size=DEFAULT_CLUSTER_SIZE):
+    """
+    Hierarchical A*. Repeated queries on the same grid reuse its clusters,
+    and barrier edits only rebuild the clusters they touch. The abstract
+    graph assumes unit costs and 4-connected moves, so other grids are
+    searched with a_star.
+    """
+    if grid.weighted or grid.connectivity != 4:
+        result = yield from a_star(grid, start, end)
+        result.message = "HPA* needs a uniform-cost 4-connected grid; ran A* instead"
+        return result
+    return (yield from planner_for(grid, cluster_size).search(grid, start, end))
@@ -0,0 +1,107 @@
+"""
+Per-run instrumentation for visualized searches.
+
+A RunStats collects, for one run, how many events of each kind the search
+produced and how the wall time split between phases:
+    search  advancing the algorithm's generator
+    apply   mirroring events onto the grid model (and into the trace)
+    render  drawing frames, i.e. painting changed cells and overlays
+    poll    handling pygame's event queue between frames
+Once the run finishes it also holds the SearchResult's own counters
+(expansions, pushes, peak frontier, path cost). Timers use
+time.perf_counter(), which is monotonic.
+"""
+import json
+import time
+from constants import *
+
+PHASES = ('search', 'apply', 'render', 'poll')
+
+
+class RunStats:
+    """Counters and phase timers for one search run."""
+
+    def __init__(self, algorithm, grid, start, end):
+        self.algorithm = algorithm
+        self.grid_size = (grid.rows, grid.cols)
+        self.connectivity = grid.connectivity
+        self.start = start
+        self.end = end
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.events = [0] * len(EVENT_NAMES)  # Count per EVENT_* code
+        self.frames = 0  # Frames drawn during the run
+        self.cached = False  # Result came from the path cache; nothing was searched
+        self.stopped = False
+        self.result = None
+        self.created = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._started = time.perf_counter()
+        self.wall = None  # Seconds from creation to finish()
+
+    def add(self, phase, seconds):
+        self.times[phase] += seconds
+
+    def finish(self, result):
+        """Records the run's SearchResult (None if it was stopped)."""
+        self.wall = time.perf_counter() - self._started
+        self.result = result
+        self.stopped = result is None
+
+    def summary_lines(self):
+        """Short lines for the on-screen overlay."""
+        total = sum(self.times.values()) or 1
+        lines = [f"{phase:<6} {self.times[phase] * 1000:9.1f} ms {self.times[phase] / total:6.1%}"
+                 for phase in PHASES]
+        lines.append(f"frames {self.frames}, events {sum(self.events)}")
+        result = self.result
+        if self.cached:
+            lines.append("cached result, no search")
+        elif self.stopped:
+            lines.append("stopped")
+        if result is not None:
+            pushes = "-" if result.pushes is None else result.pushes
+            lines.append(f"expanded {result.expansions}, pushed {pushes}")
+            lines.append(f"peak open {result.peak_open}")
+            if result.bound is not None:
+                lines.append(f"bound {result.bound:.3g}x optimal")
+            if result.pruned is not None:
+                lines.append(f"pruned {result.pruned}")
+            if result.found:
+                lines.append(f"cost {result.cost:.6g}, {result.steps} steps")
+            else:
+                lines.append("no path")
+        return lines
+
+    def to_dict(self):
+        result = self.result
+        record = {
+            "algorithm": self.algorithm,
+            "created": self.created,
+            "grid": list(self.grid_size),
+            "connectivity": self.connectivity,
+            "start": self.start,
+            "end": self.end,
+            "cached": self.cached,
+            "stopped": self.stopped,
+            "wall_s": None if self.wall is None else round(self.wall, 6),
+            "phases_s": {phase: round(seconds, 6) for phase, seconds in self.times.items()},
+            "frames": self.frames,
+            "events": {name: count for name, count in zip(EVENT_NAMES, self.events) if count},
+        }
+        if result is not None:
+            record["result"] = {
+                "found": result.found,
+                "expansions": result.expansions,
+                "pushes": result.pushes,
+                "peak_open": result.peak_open,
+                "cost": result.cost,
+                "steps": result.steps,
+                "bound": result.bound,
+                "pruned": result.pruned,
+                "message": result.message,
+            }
+        return record
+
+    def export(self, path):
+        """Writes the run as JSON to 'path'."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -14,4 +14,6 @@ if __name__ == "__main__":
 
     # Create and run the visualizer
     visualizer_app = PathfindingVisualizer(WIN, WIDTH, ROWS)
+    if len(sys.argv) > 1:
+        visualizer_app.open_map(sys.argv[1])  # A saved grid or a Moving AI .map
     visualizer_app.main_loop() # Start the main event loop
@@ -0,0 +1,293 @@
+"""
+Memory-bounded searches: SMA* and beam search under a hard cap on stored
+nodes.
+
+Every node a search keeps (its g-cost, parent and bookkeeping) lives in
+dicts that never grow past 'max_nodes' entries, and the open lists are
+compacted so their stale entries stay in proportion. Memory use is then
+set by the cap, not by the grid, which keeps many searches running side
+by side predictable.
+
+sma_star is Simplified Memory-bounded A* (Russell, 1992). It runs A* until
+the cap is reached, then forgets the worst leaf (highest f, shallowest)
+to make room. The forgotten node's f is backed up into its parent, which
+goes back on the open list so the branch can be regenerated once it is
+the most promising one again. Expanded nodes that end up with no stored
+successors are dead ends; they are dropped when no leaf is worse than the
+best one, as forgetting that one would only bring it straight back. With
+a consistent heuristic the path returned is optimal whenever the cap can
+hold it; when it cannot, the search reports that it ran out of memory.
+
+beam_search keeps only the 'beam_width' best successors (by g + h) of
+each layer. Cells that left the beam are garbage-collected once the cap
+is reached, keeping only the ancestors of the current beam. It is fast
+and uses little memory but gives no optimality guarantee and may miss
+paths altogether.
+
+Forgotten cells are announced with EVENT_FORGET. Results count the nodes
+pruned (forgotten, or left out of a beam) in 'pruned'.
+"""
+import math
+from heapq import heappush, heappop, heapify
+from constants import *
+from algorithms import SearchResult, emit_path, path_cost
+import heuristics
+
+DEFAULT_MAX_NODES = 4096
+DEFAULT_BEAM_WIDTH = 32
+# The open lists are rebuilt once they hold this many times more entries
+# than live nodes
+COMPACT_RATIO = 4
+
+
+def _stored_path(parent, end):
+    path = [end]
+    while parent[path[-1]] is not None:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
+def _pruned_message(name, pruned, max_nodes):
+    if pruned:
+        return f"{name}: pruned {pruned} node(s) to stay within {max_nodes} stored"
+    return f"{name}: no pruning needed within {max_nodes} stored nodes"
+
+
+# --- SMA* ---
+def sma_star(grid, start, end, max_nodes=DEFAULT_MAX_NODES, heuristic=None):
+    """SMA*: A* that stores at most 'max_nodes' nodes, forgetting the worst leaves when full."""
+    if max_nodes < 2:
+        raise ValueError(f"max_nodes must be at least 2, not {max_nodes}")
+    too_few = f"SMA*: {max_nodes} stored nodes are too few to reach the goal"
+    if heuristics.min_moves(grid, start, end) + 1 > max_nodes:
+        return SearchResult(False, pruned=0, message=too_few)
+    estimate = heuristics.resolve(grid, heuristic)
+    expansions = 0
+    peak_open = 0
+    pushes = 1
+    pruned = 0
+
+    # Stored nodes; every dict below holds at most max_nodes keys
+    g = {start: 0}
+    f = {start: estimate(grid, start, end)}
+    parent = {start: None}
+    children = {start: 0}  # Stored nodes whose parent this one is
+    depth = {start: 0}  # Moves from start
+    forgotten = {}  # Lowest f among a node's forgotten successors
+    # Expanded nodes without successors to explore: every neighbor is
+    # stored with a better g-cost. They are the first to go when memory
+    # runs out, as nothing has to be regenerated for them.
+    dead = {}
+    # Open list as two lazily deleted heaps over the same entries: lowest
+    # f (deepest first) to expand, highest f (shallowest first) to forget.
+    # An entry is live while queued[cell] holds its count.
+    queued = {}
+    best, worst = [], []
+    count = 0
+
+    def push(cell):
+        nonlocal count
+        count += 1
+        queued[cell] = count
+        dead.pop(cell, None)
+        heappush(best, (f[cell], -g[cell], count, cell))
+        heappush(worst, (-f[cell], g[cell], count, cell))
+        if len(best) > COMPACT_RATIO * (len(queued) + 16):
+            best[:] = [entry for entry in best if queued.get(entry[3]) == entry[2]]
+            worst[:] = [entry for entry in worst if queued.get(entry[3]) == entry[2]]
+            heapify(best)
+            heapify(worst)
+
+    def top(heap):
+        """The live entry at the top of a heap, dropping stale ones."""
+        while queued.get(heap[0][3]) != heap[0][2]:
+            heappop(heap)
+        return heap[0][3]
+
+    def worst_leaf():
+        """
+        The queued node to forget: highest f, then shallowest, among those
+        without successors. None if every queued node has some.
+        """
+        skipped = []
+        cell = None
+        while queued and worst:
+            candidate = top(worst)
+            if children[candidate] == 0:
+                cell = candidate
+                break
+            skipped.append(heappop(worst))  # Still queued, just not forgettable
+        for entry in skipped:
+            heappush(worst, entry)
+        return cell
+
+    def check_dead(cell):
+        # The node being expanded is not done yet, whatever its counts say
+        if cell != start and cell != current and children[cell] == 0 \
+                and cell not in queued and cell not in forgotten:
+            dead[cell] = None
+
+    def drop(cell):
+        """Removes a stored node and returns its parent."""
+        above = parent.pop(cell)
+        del g[cell], f[cell], children[cell], depth[cell]
+        forgotten.pop(cell, None)
+        queued.pop(cell, None)
+        dead.pop(cell, None)
+        children[above] -= 1
+        return above
+
+    current = None
+    push(start)
+    while queued:
+        if len(queued) > peak_open:
+            peak_open = len(queued)
+        current = top(best)
+        if f[current] == math.inf:
+            break  # Every queued node is too deep to reach the goal within the cap
+        del queued[current]
+        expansions += 1
+
+        if current == end:
+            path = _stored_path(parent, end)
+            yield from emit_path(path)
+            return SearchResult(True, path, expansions, _pruned_message("SMA*", pruned, max_nodes),
+                                peak_open=peak_open, cost=path_cost(grid, path), pushes=pushes,
+                                pruned=pruned)
+
+        forgotten.pop(current, None)  # Its successors are all regenerated now
+        g_current, f_current = g[current], f[current]
+        for neighbor, step in grid.moves(current):
+            temp_g_score = g_current + step
+            old_g = g.get(neighbor)
+            if old_g is not None and old_g <= temp_g_score:
+                continue
+            if old_g is None:
+                children[neighbor] = 0
+            else:
+                children[parent[neighbor]] -= 1
+                check_dead(parent[neighbor])
+            g[neighbor] = temp_g_score
+            parent[neighbor] = current
+            children[current] += 1
+            depth[neighbor] = depth[current] + 1
+            if depth[neighbor] + heuristics.min_moves(grid, neighbor, end) + 1 > max_nodes:
+                # No path through it fits in the cap
+                f[neighbor] = math.inf
+            else:
+                # Pathmax: f never drops below the parent's
+                f[neighbor] = max(f_current, temp_g_score + estimate(grid, neighbor, end))
+            push(neighbor)
+            pushes += 1
+            yield EVENT_OPEN, neighbor
+
+            # --- Make room: the worst leaves first, then dead ends ---
+            while len(g) > max_nodes:
+                victim = worst_leaf()
+                if victim is None or f[victim] <= f[top(best)]:
+                    # No leaf is worse than the best one, and forgetting that
+                    # would only bring it straight back
+                    if not dead:
+                        return SearchResult(False, expansions=expansions, peak_open=peak_open,
+                                            pushes=pushes, pruned=pruned, message=too_few)
+                    victim = next(iter(dead))
+                    check_dead(drop(victim))
+                    pruned += 1
+                    yield EVENT_FORGET, victim
+                    continue
+                victim_f = f[victim]
+                above = drop(victim)
+                pruned += 1
+                yield EVENT_FORGET, victim
+                # Back the forgotten f up into the parent, which is queued
+                # again (unless it is being expanded right now) so the
+                # branch can be regenerated later. A parent already queued
+                # must move up if the branch is cheaper than its queued f.
+                forgotten[above] = min(forgotten.get(above, math.inf), victim_f)
+                dead.pop(above, None)
+                if above != current and (above not in queued or forgotten[above] < f[above]):
+                    f[above] = forgotten[above]
+                    push(above)
+
+        yield EVENT_CLOSED, current
+        if current in forgotten:
+            # Successors of its own were forgotten while it was expanded
+            f[current] = forgotten[current]
+            push(current)
+        else:
+            check_dead(current)
+
+    return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes, pruned=pruned,
+                        message=too_few if pruned or queued else _pruned_message("SMA*", pruned, max_nodes))
+
+
+# --- Beam Search ---
+def beam_search(grid, start, end, beam_width=DEFAULT_BEAM_WIDTH, max_nodes=DEFAULT_MAX_NODES,
+                heuristic=None):
+    """
+    Breadth-first layers cut down to the 'beam_width' successors with the
+    lowest g + h, storing at most 'max_nodes' nodes.
+    """
+    if beam_width < 1:
+        raise ValueError(f"beam_width must be at least 1, not {beam_width}")
+    if max_nodes < beam_width:
+        raise ValueError(f"max_nodes ({max_nodes}) must be at least beam_width ({beam_width})")
+    estimate = heuristics.resolve(grid, heuristic)
+    expansions = 0
+    peak_open = 1
+    pushes = 1
+    pruned = 0
+    g = {start: 0}
+    parent = {start: None}
+    beam = [start]
+
+    while beam:
+        candidates = {}  # Successor -> (g-cost, parent)
+        for current in beam:
+            expansions += 1
+            if current == end:
+                path = _stored_path(parent, end)
+                yield from emit_path(path)
+                return SearchResult(True, path, expansions, _pruned_message("Beam search", pruned, max_nodes),
+                                    peak_open=peak_open, cost=path_cost(grid, path), pushes=pushes,
+                                    pruned=pruned)
+            g_current = g[current]
+            for neighbor, step in grid.moves(current):
+                temp_g_score = g_current + step
+                if g.get(neighbor, math.inf) <= temp_g_score:
+                    continue
+                if neighbor not in candidates or temp_g_score < candidates[neighbor][0]:
+                    candidates[neighbor] = (temp_g_score, current)
+            yield EVENT_CLOSED, current
+
+        ranked = sorted(candidates, key=lambda cell: (candidates[cell][0] + estimate(grid, cell, end),
+                                                      -candidates[cell][0]))
+        beam = ranked[:beam_width]
+        pruned += len(ranked) - len(beam)
+
+        # --- Keep only the ancestors of the new beam once the cap is reached ---
+        if len(g) + len(beam) > max_nodes:
+            keep = set()
+            for cell in beam:
+                cell = candidates[cell][1]
+                while cell is not None and cell not in keep:
+                    keep.add(cell)
+                    cell = parent[cell]
+            if len(keep) + len(beam) > max_nodes:
+                return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes,
+                                    pruned=pruned,
+                                    message=f"Beam search: {max_nodes} stored nodes are too few for paths this long")
+            for cell in [cell for cell in g if cell not in keep]:
+                del g[cell], parent[cell]
+                pruned += 1
+                yield EVENT_FORGET, cell
+
+        for cell in beam:
+            g[cell], parent[cell] = candidates[cell]
+            pushes += 1
+            yield EVENT_OPEN, cell
+        if len(beam) > peak_open:
+            peak_open = len(beam)
+
+    return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=pushes, pruned=pruned,
+                        message=_pruned_message("Beam search", pruned, max_nodes))
@@ -1,62 +1,49 @@
-import pygame
 from constants import *
 
 class Node:
-    def __init__(self, row, col, width, total_rows):
+    """
+    Thin view of one cell of a GridModel. The cell state lives in the
+    model's byte array; a Node only knows where to find it. Drawing is
+    GridRenderer's job, through the camera.
+    """
+    __slots__ = ("model", "index", "row", "col")
+
+    def __init__(self, model, row, col):
+        self.model = model
+        self.index = model.index(row, col)
         self.row = row
         self.col = col
-        self.x = row * width
-        self.y = col * width
-        self.color = WHITE
-        self.neighbors = []
-        self.width = width
-        self.total_rows = total_rows
-        self.came_from = None # Used in some algorithms for path reconstruction
 
     def get_pos(self):
         return self.row, self.col
 
+    @property
+    def color(self):
+        return STATE_COLORS[self.model.cells[self.index]]
+
     # State checks
-    def is_closed(self): return self.color == RED
-    def is_open(self): return self.color == GREEN
-    def is_barrier(self): return self.color == BLACK
-    def is_start(self): return self.color == ORANGE
-    def is_end(self): return self.color == TURQUOISE
-    def is_path(self): return self.color == PURPLE
-    def is_current(self): return self.color == CYAN
-    def is_reset(self): return self.color == WHITE
+    def is_closed(self): return self.model.cells[self.index] == STATE_CLOSED
+    def is_open(self): return self.model.cells[self.index] == STATE_OPEN
+    def is_barrier(self): return self.model.cells[self.index] == STATE_BARRIER
+    def is_start(self): return self.model.cells[self.index] == STATE_START
+    def is_end(self): return self.model.cells[self.index] == STATE_END
+    def is_path(self): return self.model.cells[self.index] == STATE_PATH
+    def is_current(self): return self.model.cells[self.index] == STATE_CURRENT
+    def is_reset(self): return self.model.cells[self.index] == STATE_EMPTY
 
     # State changes
-    def reset(self): self.color = WHITE; self.came_from = None
-    def make_start(self): self.color = ORANGE
-    def make_closed(self): self.color = RED
-    def make_open(self): self.color = GREEN
-    def make_barrier(self): self.color = BLACK
-    def make_end(self): self.color = TURQUOISE
-    def make_path(self): self.color = PURPLE
-    def make_current(self): self.color = CYAN
-
-    def draw(self, win):
-        pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
-
-    def update_neighbors(self, grid):
-        self.neighbors = []
-        # Down
-        if self.row < self.total_rows - 1 and not grid[self.row + 1][self.col].is_barrier():
-            self.neighbors.append(grid[self.row + 1][self.col])
-        # Up
-        if self.row > 0 and not grid[self.row - 1][self.col].is_barrier():
-            self.neighbors.append(grid[self.row - 1][self.col])
-        # Right
-        if self.col < self.total_rows - 1 and not grid[self.row][self.col + 1].is_barrier():
-            self.neighbors.append(grid[self.row][self.col + 1])
-        # Left
-        if self.col > 0 and not grid[self.row][self.col - 1].is_barrier():
-            self.neighbors.append(grid[self.row][self.col - 1])
-        # Diagonals (Optional - Keep commented if not used)
-        # ...
-
-    def __lt__(self, other):
-        # Necessary for PriorityQueue if nodes are put directly
-        # Here we put tuples (score, count, node), so this isn't strictly needed
-        return False
\ No newline at end of file
+    def reset(self): self.model.set_state(self.index, STATE_EMPTY)
+    def make_start(self): self.model.set_state(self.index, STATE_START)
+    def make_closed(self): self.model.set_state(self.index, STATE_CLOSED)
+    def make_open(self): self.model.set_state(self.index, STATE_OPEN)
+    def make_barrier(self): self.model.set_state(self.index, STATE_BARRIER)
+    def make_end(self): self.model.set_state(self.index, STATE_END)
+    def make_path(self): self.model.set_state(self.index, STATE_PATH)
+    def make_current(self): self.model.set_state(self.index, STATE_CURRENT)
+
+    # Views are created on demand, so compare by the cell they point at
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.index == other.index and self.model is other.model
+
+    def __hash__(self):
+        return hash(self.index)
@@ -0,0 +1,293 @@
+from collections import deque
+from heapq import heappush, heappop
+
+# --- Tie-Breaking ---
+# Entries with equal priority are ordered by (tie, count). 'tie' comes from
+# the cell's g-cost and 'count' is the insertion order.
+TIE_BREAKS = ('fifo', 'lifo', 'high_g', 'low_g')
+
+
+def _tie_rule(tie_break):
+    """Returns (g_sign, count_sign) for a tie-breaking policy."""
+    if tie_break == 'fifo':
+        return 0, 1
+    if tie_break == 'lifo':
+        return 0, -1
+    if tie_break == 'high_g':
+        return -1, 1  # Deeper cells first: fewer expansions on A* plateaus
+    if tie_break == 'low_g':
+        return 1, 1
+    raise ValueError(f"Unknown tie-break policy '{tie_break}' (expected one of {TIE_BREAKS})")
+
+
+# --- Open Lists ---
+# None of these lock: searches are single-threaded. Every open list supports
+# push(cell, priority, g), pop() -> cell, len() and truthiness. The priority
+# queues also support 'cell in open_list', min_priority() and remove(cell).
+
+class HeapOpenList:
+    """
+    Binary heap (heapq) with lazy deletion. Pushing a cell that is already
+    queued just adds a better entry; the stale one is skipped when popped.
+    """
+
+    def __init__(self, tie_break='fifo'):
+        self._heap = []
+        self._best = {}  # Cell -> priority of its live entry
+        self._count = 0
+        self._g_sign, self._count_sign = _tie_rule(tie_break)
+
+    def push(self, cell, priority, g=0):
+        self._count += 1
+        self._best[cell] = priority
+        heappush(self._heap, (priority, self._g_sign * g, self._count_sign * self._count, cell))
+
+    def pop(self):
+        heap = self._heap
+        best = self._best
+        while True:
+            priority, _, _, cell = heappop(heap)
+            if best.get(cell) == priority:
+                del best[cell]
+                return cell
+
+    def min_priority(self):
+        """Priority of the entry pop() would return next."""
+        heap = self._heap
+        best = self._best
+        while best.get(heap[0][3]) != heap[0][0]:
+            heappop(heap)  # Drop stale entries from the top
+        return heap[0][0]
+
+    def priority(self, cell):
+        return self._best.get(cell)
+
+    def remove(self, cell):
+        """Takes a queued cell out; its heap entry goes stale and is skipped later."""
+        del self._best[cell]
+
+    def __contains__(self, cell):
+        return cell in self._best
+
+    def __len__(self):
+        return len(self._best)
+
+
+class IndexedHeap:
+    """
+    Binary heap that tracks each cell's position, so push() on a queued cell
+    is an in-place decrease-key (or increase-key) with no stale entries.
+    """
+
+    def __init__(self, tie_break='fifo'):
+        self._heap = []  # Entries [priority, tie, count, cell]
+        self._pos = {}  # Cell -> index of its entry in _heap
+        self._count = 0
+        self._g_sign, self._count_sign = _tie_rule(tie_break)
+
+    def push(self, cell, priority, g=0):
+        self._count += 1
+        entry = [priority, self._g_sign * g, self._count_sign * self._count, cell]
+        index = self._pos.get(cell)
+        if index is None:
+            self._heap.append(entry)
+            self._sift_up(len(self._heap) - 1)
+        else:
+            old = self._heap[index]
+            self._heap[index] = entry
+            if entry < old:
+                self._sift_up(index)
+            else:
+                self._sift_down(index)
+
+    def pop(self):
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        del self._pos[top[3]]
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return top[3]
+
+    def min_priority(self):
+        return self._heap[0][0]
+
+    def priority(self, cell):
+        index = self._pos.get(cell)
+        return None if index is None else self._heap[index][0]
+
+    def remove(self, cell):
+        heap = self._heap
+        index = self._pos.pop(cell)
+        last = heap.pop()
+        if index < len(heap):
+            old = heap[index]
+            heap[index] = last
+            if last < old:
+                self._sift_up(index)
+            else:
+                self._sift_down(index)
+
+    def _sift_up(self, index):
+        heap = self._heap
+        pos = self._pos
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if entry < heap[parent]:
+                heap[index] = heap[parent]
+                pos[heap[index][3]] = index
+                index = parent
+            else:
+                break
+        heap[index] = entry
+        pos[entry[3]] = index
+
+    def _sift_down(self, index):
+        heap = self._heap
+        pos = self._pos
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if heap[child] < entry:
+                heap[index] = heap[child]
+                pos[heap[index][3]] = index
+                index = child
+            else:
+                break
+        heap[index] = entry
+        pos[entry[3]] = index
+
+    def __contains__(self, cell):
+        return cell in self._pos
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class BucketOpenList:
+    """
+    Dial's bucket queue for small non-negative integer priorities: one
+    bucket per priority value and a cursor on the lowest non-empty one, so
+    push and pop are O(1) when priorities never go below the last pop (as
+    in Dijkstra and A* with a consistent heuristic). Lazy deletion as in
+    HeapOpenList. Ties within a bucket are popped oldest first ('fifo',
+    'low_g') or newest first ('lifo', 'high_g'; recent pushes are usually
+    the deepest cells).
+    """
+
+    def __init__(self, tie_break='fifo'):
+        _tie_rule(tie_break)  # Validates the name
+        self._buckets = []  # Priority -> deque of cells
+        self._best = {}  # Cell -> priority of its live entry
+        self._cursor = 0  # No live entry has a lower priority
+        self._newest_first = tie_break in ('lifo', 'high_g')
+
+    def push(self, cell, priority, g=0):
+        buckets = self._buckets
+        while len(buckets) <= priority:
+            buckets.append(deque())
+        try:
+            buckets[priority].append(cell)
+        except TypeError:
+            raise ValueError(f"The bucket open list needs integer priorities, got {priority!r} "
+                             "(use 'heap' with diagonal moves or a fractional heuristic)") from None
+        self._best[cell] = priority
+        if priority < self._cursor:
+            self._cursor = priority
+
+    def _advance(self):
+        """Moves the cursor to the first bucket whose next entry is live."""
+        buckets = self._buckets
+        best = self._best
+        cursor = self._cursor
+        while True:
+            bucket = buckets[cursor]
+            while bucket:
+                cell = bucket[-1] if self._newest_first else bucket[0]
+                if best.get(cell) == cursor:
+                    self._cursor = cursor
+                    return bucket
+                if self._newest_first:  # Stale entry
+                    bucket.pop()
+                else:
+                    bucket.popleft()
+            cursor += 1
+
+    def pop(self):
+        bucket = self._advance()
+        cell = bucket.pop() if self._newest_first else bucket.popleft()
+        del self._best[cell]
+        return cell
+
+    def min_priority(self):
+        self._advance()
+        return self._cursor
+
+    def priority(self, cell):
+        return self._best.get(cell)
+
+    def remove(self, cell):
+        del self._best[cell]
+
+    def __contains__(self, cell):
+        return cell in self._best
+
+    def __len__(self):
+        return len(self._best)
+
+
+class FifoOpenList:
+    """First-in first-out frontier (collections.deque); priorities are ignored."""
+
+    def __init__(self, tie_break='fifo'):
+        self._queue = deque()
+
+    def push(self, cell, priority=0, g=0):
+        self._queue.append(cell)
+
+    def pop(self):
+        return self._queue.popleft()
+
+    def __len__(self):
+        return len(self._queue)
+
+
+class LifoOpenList:
+    """Last-in first-out frontier (plain list stack); priorities are ignored."""
+
+    def __init__(self, tie_break='lifo'):
+        self._stack = []
+
+    def push(self, cell, priority=0, g=0):
+        self._stack.append(cell)
+
+    def pop(self):
+        return self._stack.pop()
+
+    def __len__(self):
+        return len(self._stack)
+
+
+OPEN_LISTS = {
+    'heap': HeapOpenList,
+    'indexed': IndexedHeap,
+    'bucket': BucketOpenList,
+    'fifo': FifoOpenList,
+    'lifo': LifoOpenList,
+}
+
+
+def make_open_list(kind='heap', tie_break='fifo'):
+    """Creates an open list by name; see OPEN_LISTS and TIE_BREAKS."""
+    try:
+        open_list_class = OPEN_LISTS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown open list '{kind}' (expected one of {tuple(OPEN_LISTS)})") from None
+    return open_list_class(tie_break)
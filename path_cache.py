@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 64
+# Parameters that make a result depend on the clock (how far an anytime
+# search got before its deadline), so it must not be replayed later
+TIME_BOUNDED_PARAMS = ('deadline',)
+
+
+class PathCache:
+    """
+    Bounded LRU cache of finished searches. Keys include the grid version,
+    so any barrier edit makes older entries unreachable; they simply age
+    out of the cache instead of being searched for and deleted.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(algorithm, grid, start, end, args=(), params=None):
+        """
+        Cache key for one search on the grid as it is right now, or None if
+        the search is time-bounded and its result must not be cached.
+        """
+        params = params or {}
+        if any(params.get(name) is not None for name in TIME_BOUNDED_PARAMS):
+            return None
+        return (algorithm, start, end, tuple(args),
+                tuple(sorted(params.items())), grid.version)
+
+    def get(self, key):
+        """Returns the cached SearchResult for 'key', or None."""
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)  # Least recently used
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,118 @@
+import pygame
+from constants import *
+
+# Palette index of a cell is state * 16 + terrain cost, so one 8-bit image
+# holds both; empty cells take their terrain color, others their state color.
+_PALETTE = [
+    (TERRAIN_COLORS[cost] if cost <= MAX_COST else WHITE) if state == STATE_EMPTY
+    else (STATE_COLORS[state] if state < len(STATE_COLORS) else BLACK)
+    for state in range(16) for cost in range(16)]
+OFF_GRID_COLOR = LIGHT_GREY
+
+
+class GridRenderer:
+    """
+    Change-tracked renderer for a GridModel seen through a Camera. A full
+    repaint packs the visible cells (every 'step'-th one when zoomed out)
+    into an 8-bit palette image and scales it to the zoom level, so its cost
+    follows the window, not the grid. Between full repaints only cells the
+    model reports as changed are filled in. Empty cells are shaded by their
+    terrain cost.
+    """
+    GRID_LINE_MIN = 4  # Cell size in pixels from which grid lines are drawn
+    # Changed cells beyond which one full repaint beats filling them one by one
+    MAX_CELL_UPDATES = 2048
+
+    def __init__(self, model, camera):
+        self.model = model
+        self.camera = camera
+        self.surface = pygame.Surface((camera.width, camera.height))
+        self._camera_version = None  # Camera version the surface was painted for
+        model.track_changes()
+
+    def cell_rect(self, index):
+        """Pixel rect of a cell's interior, inside its grid lines."""
+        row, col = divmod(index, self.model.cols)
+        x, y = self.camera.cell_origin(row, col)
+        size = self.camera.cell_size
+        inset = 1 if size >= self.GRID_LINE_MIN else 0
+        return pygame.Rect(x + inset, y + inset, size - inset, size - inset)
+
+    def cell_color(self, index):
+        state = self.model.cells[index]
+        if state == STATE_EMPTY:
+            return TERRAIN_COLORS[self.model.costs[index]]
+        return STATE_COLORS[state]
+
+    def invalidate(self):
+        """Forces a full repaint on the next call to paint()."""
+        self.model.all_changed = True
+
+    def paint(self):
+        """
+        Brings the cached surface up to date with the model. Returns the list
+        of rects that changed, or None if the whole surface was repainted.
+        """
+        model = self.model
+        camera = self.camera
+        # Below one pixel per cell a changed cell may or may not be the one
+        # sampled for its pixel, so any change repaints the view.
+        if model.all_changed or self._camera_version != camera.version \
+                or (model.changed and camera.cell_size < 1) \
+                or len(model.changed) > self.MAX_CELL_UPDATES:
+            self._repaint()
+            return None
+
+        surface = self.surface
+        view = surface.get_rect()
+        cols = model.cols
+        first_row, end_row, first_col, end_col = self._visible
+        rects = []
+        for index in model.changed:
+            row, col = divmod(index, cols)
+            if first_row <= row < end_row and first_col <= col < end_col:
+                rect = self.cell_rect(index).clip(view)
+                surface.fill(self.cell_color(index), rect)
+                rects.append(rect)
+        model.changed.clear()
+        return rects
+
+    def _repaint(self):
+        model, camera, surface = self.model, self.camera, self.surface
+        model.all_changed = False
+        model.changed.clear()
+        self._camera_version = camera.version
+        self._visible = first_row, end_row, first_col, end_col = camera.visible()
+        surface.fill(OFF_GRID_COLOR)
+        if first_row >= end_row or first_col >= end_col:
+            return
+
+        # One byte per drawn cell, grid row by grid row (a screen column each)
+        cols, step = model.cols, camera.step
+        cells, costs = model.cells, model.costs
+        sampled_rows = range(first_row, end_row, step)
+        states = b''.join(cells[row * cols + first_col:row * cols + end_col:step] for row in sampled_rows)
+        terrain = b''.join(costs[row * cols + first_col:row * cols + end_col:step] for row in sampled_rows)
+        # state * 16 + cost for every byte at once; both are below 16, so no
+        # bits cross into the next byte
+        pixels = ((int.from_bytes(states, 'little') << 4)
+                  | int.from_bytes(terrain, 'little')).to_bytes(len(states), 'little')
+        sampled_cols = len(range(first_col, end_col, step))
+        image = pygame.image.fromstring(pixels, (sampled_cols, len(sampled_rows)), 'P')
+        image.set_palette(_PALETTE)
+        # Transpose: the image's lines are grid rows, which run down the screen
+        image = pygame.transform.flip(pygame.transform.rotate(image, -90), True, False)
+        size = camera.cell_size
+        if size > 1:
+            image = pygame.transform.scale(image, (len(sampled_rows) * size, sampled_cols * size))
+        left, top = map(int, camera.cell_origin(first_row, first_col))
+        surface.blit(image, (left, top))
+
+        if size >= self.GRID_LINE_MIN:
+            right, bottom = camera.cell_origin(end_row, end_col)
+            for row in range(first_row, end_row + 1):
+                x = camera.x + row * size
+                pygame.draw.line(surface, GREY, (x, top), (x, bottom))
+            for col in range(first_col, end_col + 1):
+                y = camera.y + col * size
+                pygame.draw.line(surface, GREY, (left, y), (right, y))
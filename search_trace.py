@@ -0,0 +1,236 @@
+"""
+Compact binary search traces: record a run's events once, replay them at
+any speed without running the algorithm again.
+
+File layout (little-endian):
+    header   magic b'PFTR', version, rows, cols, start, end   (HEADER)
+    board    rows * cols bytes of cell states, then the same of terrain costs
+    events   5 bytes each: int32 cell index + uint8 EVENT_* opcode (RECORD)
+The board is the grid as the search saw it, before any search colors.
+EVENT_RESET is stored with cell -1 and EVENT_CLOSED_LAYER as one
+EVENT_CLOSED record per cell. EVENT_SOLUTION is not stored, as the path
+events around it already show the published path. The event count
+follows from the file size, so a trace cut short by a crash is still
+readable up to its last whole record.
+
+Traces are read through mmap and decoded only around the position being
+shown, so traces of millions of events can be browsed without loading
+them into Python objects.
+
+Usage:
+    python search_trace.py --map random20 --size 1024 --algorithm bfs --output run.trace
+    python search_trace.py --info run.trace
+"""
+import argparse
+import mmap
+import struct
+import time
+from collections import Counter
+from constants import *
+import benchmark
+import solver
+
+MAGIC = b'PFTR'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xIIii')
+RECORD = struct.Struct('<iB')
+NO_CELL = -1  # Cell field of an EVENT_RESET record
+FLUSH_BYTES = 1 << 20
+
+
+# --- Recording ---
+class TraceWriter:
+    """
+    Appends search events to a trace file. record(event, cell) has the
+    solver's on_event signature, so it can subscribe to any run.
+    """
+
+    def __init__(self, path, grid, start, end):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, grid.rows, grid.cols, start, end))
+        self._file.write(bytes(grid.cells))
+        self._file.write(bytes(grid.costs))
+        self._buffer = bytearray()
+
+    def record(self, event, cell):
+        pack = RECORD.pack
+        if event == EVENT_SOLUTION:
+            return
+        if event == EVENT_CLOSED_LAYER:
+            self._buffer += b''.join(pack(index, EVENT_CLOSED) for index in cell)
+            self.count += len(cell)
+        else:
+            self._buffer += pack(NO_CELL if cell is None else cell, event)
+            self.count += 1
+        if len(self._buffer) >= FLUSH_BYTES:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --- Reading ---
+class SearchTrace:
+    """Read-only, memory-mapped view of a trace file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, self.start, self.end = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} search trace")
+        size = self.rows * self.cols
+        self._events_at = HEADER.size + 2 * size
+        if len(self._map) < self._events_at:
+            self._map.close()
+            raise ValueError(f"{path} is truncated inside its board")
+        self.count = (len(self._map) - self._events_at) // RECORD.size
+
+    @property
+    def cells(self):
+        """The recorded board's cell states (a memoryview into the file)."""
+        return memoryview(self._map)[HEADER.size:HEADER.size + self.rows * self.cols]
+
+    @property
+    def costs(self):
+        size = self.rows * self.cols
+        return memoryview(self._map)[HEADER.size + size:self._events_at]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        """The (event, cell) at 'position'."""
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        cell, event = RECORD.unpack_from(self._map, self._events_at + position * RECORD.size)
+        return event, cell
+
+    def events(self, begin=0, end=None):
+        """Iterates (event, cell) over positions begin..end-1, decoding lazily."""
+        end = self.count if end is None else min(end, self.count)
+        if begin >= end:
+            return
+        offset = self._events_at
+        records = memoryview(self._map)[offset + begin * RECORD.size:offset + end * RECORD.size]
+        for cell, event in RECORD.iter_unpack(records):
+            yield event, cell
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --- Replay ---
+class TraceReplayer:
+    """
+    Shows a trace on a GridModel at any position. seek() moves forward by
+    applying events and backward by restoring the nearest earlier
+    checkpoint (a copy of the cell states, taken every 'interval' events
+    while moving forward) and replaying from there.
+    """
+    MIN_INTERVAL = 1 << 16
+    MAX_CHECKPOINTS = 64
+
+    def __init__(self, trace, grid):
+        if (grid.rows, grid.cols) != (trace.rows, trace.cols):
+            raise ValueError(f"Trace is {trace.rows}x{trace.cols}, grid is {grid.rows}x{grid.cols}")
+        self.trace = trace
+        self.grid = grid
+        self.position = 0  # Events applied so far
+        self.interval = max(self.MIN_INTERVAL, -(-trace.count // self.MAX_CHECKPOINTS))
+        grid.cells[:] = trace.cells
+        grid.costs[:] = trace.costs
+        grid.weighted_cells = grid.size - bytes(trace.costs).count(DEFAULT_COST)
+        grid.rebuild_links()
+        grid.version += 1
+        grid.all_changed = True
+        self._checkpoints = {0: bytes(grid.cells)}
+
+    def _apply(self, event, cell):
+        if event == EVENT_RESET:
+            self.grid.reset_search()
+        elif cell != self.trace.start and cell != self.trace.end:
+            self.grid.set_state(cell, EVENT_STATES[event])
+
+    def seek(self, position):
+        """Shows the board as it was after 'position' events (clamped to the trace)."""
+        position = max(0, min(position, self.trace.count))
+        if position < self.position or position - self.position > self.interval:
+            base = position - position % self.interval
+            while base not in self._checkpoints:  # Not reached yet: start from an earlier one
+                base -= self.interval
+            if base > self.position or position < self.position:
+                self.grid.cells[:] = self._checkpoints[base]
+                self.grid.all_changed = True
+                self.position = base
+        for event, cell in self.trace.events(self.position, position):
+            self._apply(event, cell)
+            self.position += 1
+            if self.position % self.interval == 0:
+                self._checkpoints.setdefault(self.position, bytes(self.grid.cells))
+        self.position = position
+
+    def step(self, delta):
+        self.seek(self.position + delta)
+
+    def at_end(self):
+        return self.position >= self.trace.count
+
+
+# --- Command Line ---
+def summary(trace):
+    """Event counts by kind, read straight off the mapped file."""
+    counts = Counter(event for event, _ in trace.events())
+    return {EVENT_NAMES[event]: count for event, count in sorted(counts.items())}
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a corpus search to a trace file, or inspect one.")
+    parser.add_argument("--map", default="random20", help=f"corpus map ({', '.join(benchmark.CORPUS)})")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--algorithm", default="a_star")
+    parser.add_argument("--seed", type=int, default=benchmark.DEFAULT_SEED)
+    parser.add_argument("--output", default="search.trace")
+    parser.add_argument("--info", metavar="TRACE", help="print a summary of an existing trace instead")
+    args = parser.parse_args()
+
+    if args.info:
+        with SearchTrace(args.info) as trace:
+            print(f"{args.info}: {trace.rows}x{trace.cols}, start {trace.start}, end {trace.end}, "
+                  f"{len(trace)} events")
+            for name, count in summary(trace).items():
+                print(f"  {name:<15} {count:>10}")
+        return
+
+    grid, start, end = benchmark.build_map(args.map, args.size, args.seed)
+    extra = benchmark.ALGORITHM_ARGS.get(args.algorithm, lambda grid: ())(grid)
+    started = time.perf_counter()
+    with TraceWriter(args.output, grid, start, end) as writer:
+        result = solver.solve(args.algorithm, grid, start, end, *extra, on_event=writer.record)
+    elapsed = time.perf_counter() - started
+    print(f"{args.algorithm} on {args.map} {args.size}x{args.size}: {result}")
+    print(f"Wrote {writer.count} events ({writer.count * RECORD.size} bytes) to {args.output} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import time
+import algorithms
+import ara_star
+import dstar_lite
+import flow_field
+import hpa
+import memory_bounded
+
+# --- Algorithm Registry ---
+# Maps the names used by the visualizer and batch tools to search generators.
+ALGORITHMS = {
+    'a_star': algorithms.a_star,
+    'ara_star': ara_star.ara_star,
+    'dijkstra': algorithms.dijkstra,
+    'bfs': algorithms.bfs,
+    'dfs': algorithms.dfs,
+    'jps': algorithms.jps,
+    'bidirectional_a_star': algorithms.bidirectional_a_star,
+    'bidirectional_bfs': algorithms.bidirectional_bfs,
+    'hpa_star': hpa.hpa_star,
+    'sma_star': memory_bounded.sma_star,
+    'beam_search': memory_bounded.beam_search,
+    'd_star_lite': dstar_lite.d_star_lite,
+    'flow_field': flow_field.flow_field,
+    'hill_climbing': algorithms.hill_climbing,
+    'lds': algorithms.lds,
+    'ids': algorithms.ids,
+}
+
+
+def search(algorithm, grid, start, end, *args, **params):
+    """Creates the event generator for a named algorithm without running it."""
+    try:
+        algo_func = ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm '{algorithm}'") from None
+    return algo_func(grid, start, end, *args, **params)
+
+
+def run(events, on_event=None, time_limit=None):
+    """
+    Drives a search generator to completion and returns its SearchResult.
+    With a time_limit (seconds) the search is abandoned once it runs over,
+    and None is returned instead.
+    """
+    try:
+        if time_limit is not None:
+            deadline = time.perf_counter() + time_limit
+            steps = 0
+            while True:
+                event = next(events)
+                if on_event is not None:
+                    on_event(*event)
+                steps += 1
+                if steps & 1023 == 0 and time.perf_counter() > deadline:
+                    events.close()
+                    return None
+        elif on_event is None:
+            while True:
+                next(events)
+        else:
+            while True:
+                on_event(*next(events))
+    except StopIteration as done:
+        return done.value
+
+
+def solve(algorithm, grid, start, end, *args, on_event=None, time_limit=None, **params):
+    """
+    Runs a search headlessly at full speed. 'on_event(event, cell)' is an
+    optional subscriber to the event stream; pygame is never involved.
+    If time_limit (seconds) runs out, the result has timed_out set.
+    """
+    events = search(algorithm, grid, start, end, *args, **params)
+    started = time.perf_counter()
+    result = run(events, on_event, time_limit)
+    if result is None:
+        result = algorithms.SearchResult(False, message=f"{algorithm}: time limit of {time_limit}s reached")
+        result.timed_out = True
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,22 @@
+"""
+Tests for batch.py: queries solved in worker processes, on a grid shared
+through read-only memory, must match the same searches run in-process.
+Run with: python -m pytest -q
+"""
+import benchmark
+import batch
+import solver
+
+
+def test_jps_batch_matches_a_star():
+    # JPS reads the cells through walkable_bytes(), which must work on the
+    # workers' read-only memoryview of the grid
+    grid, _, _ = benchmark.build_map('random20', 64)
+    queries = batch.random_queries(grid, 50, seed=1)
+    results = dict(batch.solve_batch(grid, queries, 'jps', processes=2))
+    assert sorted(results) == list(range(len(queries)))
+    for index, (start, end) in enumerate(queries):
+        expected = solver.solve('a_star', grid, start, end)
+        assert results[index].found == expected.found, (start, end)
+        if expected.found:
+            assert results[index].cost == expected.cost, (start, end)
@@ -0,0 +1,61 @@
+"""
+Regression tests for D* Lite replanning: after barrier and terrain edits
+(and start moves) every repaired path must cost what a fresh Dijkstra
+search finds. Run with: python -m pytest -q
+"""
+import math
+import random
+import pytest
+from constants import *
+from grid_model import GridModel
+import solver
+
+GRIDS = 12  # Random grids per case
+QUERIES = 60  # Edit-then-replan queries per grid
+
+
+def _random_grid(rng, size, connectivity, weighted):
+    grid = GridModel(size, connectivity=connectivity)
+    for cell in range(grid.size):
+        if rng.random() < 0.2:
+            grid.set_state(cell, STATE_BARRIER)
+        elif weighted and rng.random() < 0.3:
+            grid.set_cost(cell, rng.randint(DEFAULT_COST, MAX_COST))
+    return grid
+
+def _free_cell(rng, grid, *taken):
+    while True:
+        cell = rng.randrange(grid.size)
+        if cell not in taken:
+            grid.set_state(cell, STATE_EMPTY)
+            return cell
+
+
+@pytest.mark.parametrize("connectivity", [4, 8])
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("seed", range(GRIDS))
+def test_replanning_matches_dijkstra(connectivity, weighted, seed):
+    rng = random.Random(seed)
+    grid = _random_grid(rng, rng.choice((20, 40, 60)), connectivity, weighted)
+    start = _free_cell(rng, grid)
+    end = _free_cell(rng, grid, start)
+    for query in range(QUERIES):
+        expected = solver.solve('dijkstra', grid, start, end)
+        result = solver.solve('d_star_lite', grid, start, end)
+        assert result.found == expected.found, (query, result.message)
+        if expected.found:
+            assert math.isclose(result.cost, expected.cost), (query, result.cost, expected.cost)
+            assert result.path[0] == start and result.path[-1] == end
+            assert all(b in grid.neighbors(a) for a, b in zip(result.path, result.path[1:]))
+
+        # Edit a few cells, sometimes moving the start as well
+        for _ in range(rng.randint(1, 4)):
+            cell = rng.randrange(grid.size)
+            if cell in (start, end):
+                continue
+            if rng.random() < 0.5:
+                grid.set_state(cell, STATE_EMPTY if grid.cells[cell] == STATE_BARRIER else STATE_BARRIER)
+            elif weighted:
+                grid.set_cost(cell, rng.randint(DEFAULT_COST, MAX_COST))
+        if rng.random() < 0.3:
+            start = _free_cell(rng, grid, end)
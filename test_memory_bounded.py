@@ -0,0 +1,36 @@
+"""
+Regression tests for SMA*: whenever it finds a path under a tight node
+cap, that path must cost what Dijkstra finds. Run with: python -m pytest -q
+"""
+import math
+import random
+import pytest
+from constants import *
+from grid_model import GridModel
+import solver
+
+GRIDS = 40  # Random grids per case
+
+
+@pytest.mark.parametrize("connectivity", [4, 8])
+@pytest.mark.parametrize("seed", range(GRIDS))
+def test_sma_star_is_optimal_under_memory_pressure(connectivity, seed):
+    rng = random.Random(seed)
+    grid = GridModel(10, connectivity=connectivity)
+    for cell in range(grid.size):
+        if rng.random() < 0.2:
+            grid.set_state(cell, STATE_BARRIER)
+        else:
+            grid.set_cost(cell, rng.randint(DEFAULT_COST, MAX_COST))
+    start, end = rng.sample(range(grid.size), 2)
+    grid.set_state(start, STATE_EMPTY)
+    grid.set_state(end, STATE_EMPTY)
+    expected = solver.solve('dijkstra', grid, start, end)
+    if not expected.found:
+        return
+    for max_nodes in (40, len(expected.path) + 1, 3 * len(expected.path)):
+        result = solver.solve('sma_star', grid, start, end, max_nodes=max_nodes)
+        if result.found:
+            assert math.isclose(result.cost, expected.cost), (max_nodes, result.cost, expected.cost)
+            assert result.path[0] == start and result.path[-1] == end
+            assert len(result.path) <= max_nodes
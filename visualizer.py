@@ -1,16 +1,24 @@
 # visualizer.py
 
 import pygame
+import os
 import sys
+import tempfile
 import time  
 from node import Node
 from constants import *  #
-import algorithms 
-# Increase recursion depth limit
-try:
-    sys.setrecursionlimit(2500)
-except Exception as e:
-    print(f"Could not set recursion depth limit: {e}")
+from grid_model import GridModel, LINK_DELTAS, CORNER_CUTTING
+from renderer import GridRenderer
+from camera import Camera
+from path_cache import PathCache
+import solver
+import flow_field
+import heuristics
+import instrumentation
+import map_io
+import memory_bounded
+import search_trace
+import wavefront
 
 
 class PathfindingVisualizer:
@@ -19,15 +27,39 @@ class PathfindingVisualizer:
     and orchestrates the pathfinding algorithm visualization.
     """
 
+    # Sizes of the centered overlay boxes
+    HELP_BOX_SIZE = (520, 620)
+    INPUT_BOX_SIZE = (300, 100)
+    POPUP_SIZE = (460, 150)
+    # Every search is recorded here so it can be replayed (P)
+    TRACE_PATH = os.path.join(tempfile.gettempdir(), "pathfinding_last.trace")
+    MAX_REPLAY_SPEED = 1 << 20  # Events per frame
+    MAP_PATH = "grid.pfmap"  # Where W saves and O opens by default
+    PAN_FRACTION = 8  # Arrow keys pan by 1/8 of the window
+    MIN_ARROW_CELL = 6  # Pixels; flow field arrows are hidden on smaller cells
+    _PAN_KEYS = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0),
+                 pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
+    STATS_REFRESH = 0.25  # Seconds between statistics overlay updates during a run
+    # Search speeds (+/-): expansions per frame, or None for as many as fit in
+    # SEARCH_FRAME_TIME, which also caps the slower speeds on heavy steps
+    SEARCH_SPEEDS = (1, 4, 16, 64, 256, 1024, None)
+    SEARCH_FRAME_TIME = 0.016  # Seconds
+    ARA_DEADLINE = 5.0  # Seconds ARA* (Y) may spend improving its path
+    DEFAULT_MEMORY_CAP = 500  # Nodes SMA* and beam search (Q) may store
+
     def __init__(self, window, width, rows):
         pygame.font.init()
         self.win_surface = window  # Store the display surface reference
         self.width = width
         self.height = width
         self.rows = rows
+        self.cols = rows
+        self.map_path = self.MAP_PATH
 
-        self.gap = self.width // self.rows
-        self.grid = self._make_grid()
+        self.model = GridModel(self.rows)
+        self.camera = Camera(self.rows, self.cols, self.width, self.height)
+        self.renderer = GridRenderer(self.model, self.camera)
+        self.path_cache = PathCache()  # Finished searches, keyed by grid version
 
         self.start_node = None
         self.end_node = None
@@ -36,15 +68,21 @@ class PathfindingVisualizer:
         self.algorithm_running = False
         self.stop_requested = False
         self.run_flag = True
+        # Running search as (events generator, trace writer, cache key, start time);
+        # main_loop advances it a frame's budget at a time
+        self._search = None
+        self.search_speed = self.SEARCH_SPEEDS.index(16)
         self.is_fullscreen = False  # Fullscreen state
 
         # --- Result Pop-up State ---
         self.show_result_popup = False
         self.result_message = ""
+        self.result_details = ""  # Path length and expansion count
         # ---------------------------
 
         # UI State
         self.algorithm_name = "None"
+        self.solution_note = ""  # Latest anytime path and its bound, after the name
         self.show_help = True
 
         # DLS Input State
@@ -53,6 +91,15 @@ class PathfindingVisualizer:
         self.input_string = ""
         self.input_target_func = None
         self.current_max_depth_lds = DEFAULT_MAX_DEPTH_LDS
+        self.memory_cap = self.DEFAULT_MEMORY_CAP
+        self.bfs_engine = 'loop'  # 'vector' expands whole layers with NumPy
+        self.show_flow_field = False  # Arrows of the End node's flow field
+        self.brush_cost = None  # Left click paints barriers, or this terrain cost
+        self.replay = None  # TraceReplayer while replay mode is on
+        self.replay_speed = 16  # Trace events applied per frame while playing
+        self.replay_playing = False
+        self.run_stats = None  # instrumentation.RunStats of the latest run
+        self.show_stats = False  # Statistics overlay under the status text
 
         # Fonts
         try:
@@ -67,88 +114,228 @@ class PathfindingVisualizer:
             self.font_medium = pygame.font.Font(None, 22)
             self.font_large = pygame.font.Font(None, 32)
 
-    def _make_grid(self):
-        """Creates the 2D list representing the grid of Node objects."""
-        grid = []
-        for i in range(self.rows):
-            grid.append([])
-            for j in range(self.rows):
-                node = Node(i, j, self.gap, self.rows)
-                grid[i].append(node)
-        return grid
-
-    def _draw_grid_lines(self):
-        """Draws the light grey lines separating grid cells."""
-        for i in range(self.rows + 1):
-            pygame.draw.line(self.win_surface, GREY,
-                             (0, i * self.gap), (self.width, i * self.gap))
-            pygame.draw.line(self.win_surface, GREY,
-                             (i * self.gap, 0), (i * self.gap, self.height))
+        # Render caches
+        self._text_cache = {}
+        self._help_cache = (None, None)  # (settings shown, surface)
+        self._arrow_cache = (None, None)  # ((goal, grid version), surface)
+        self._overlay_keys = None  # Overlay contents on screen; None forces a full frame
+        self._stats_cache = (None, None, 0.0)  # (lines shown, surface, time rendered)
+
+    def _node(self, row, col):
+        """Returns a Node view of the model cell at (row, col)."""
+        return Node(self.model, row, col)
 
     def _get_clicked_pos(self, pos):
-        """Converts pixel coordinates (mouse position) to grid row and column."""
-        y, x = pos
-        # Adjust for potential scaling/offset in fullscreen if necessary (simple version assumes direct mapping)
-        row = y // self.gap
-        col = x // self.gap
-        row = max(0, min(self.rows - 1, row))
-        col = max(0, min(self.rows - 1, col))
-        return row, col
+        """
+        Converts pixel coordinates (mouse position) to grid (row, col)
+        through the camera, or None if the pixel is off the grid.
+        """
+        return self.camera.cell_at(pos)
 
     def draw(self):
-        """Main drawing function, called each frame."""
-        # Use self.win_surface for all drawing
-        self.win_surface.fill(WHITE)
+        """
+        Main drawing function, called each frame. Only cells that changed since
+        the last frame are repainted and pushed to the display; an overlay is
+        redrawn when something underneath it changed.
+        """
+        cell_rects = self.renderer.paint()
+        overlays = self._overlays()
+        overlay_keys = [key for key, _, _ in overlays]
 
-        for row in self.grid:
-            for node in row:
-                node.draw(self.win_surface)
+        if cell_rects is None or overlay_keys != self._overlay_keys:
+            # Full frame: the whole grid was repainted or the UI changed
+            self._overlay_keys = overlay_keys
+            self.win_surface.blit(self.renderer.surface, (0, 0))
+            for _, _, draw_overlay in overlays:
+                draw_overlay()
+            pygame.display.update()
+            return
+
+        # An overlay touching a repainted cell is redrawn whole, which may in
+        # turn expose an overlay stacked on top of it.
+        dirty = cell_rects
+        grew = True
+        while grew:
+            grew = False
+            for _, rect, _ in overlays:
+                if rect not in dirty and rect.collidelist(dirty) != -1:
+                    dirty.append(rect)
+                    grew = True
+        if not dirty:
+            return
 
-        self._draw_grid_lines()
+        for rect in dirty:
+            self.win_surface.blit(self.renderer.surface, rect, rect)
+        for _, rect, draw_overlay in overlays:
+            if rect in dirty:
+                draw_overlay()
+        pygame.display.update(dirty)
+
+    def _overlays(self):
+        """
+        Lists the UI layers drawn over the grid, bottom to top, as
+        (key, rect, draw) tuples. The key changes whenever the content does.
+        """
+        overlays = []
+
+        # Flow field arrows, under everything else
+        if self.show_flow_field and self.end_node:
+            field = flow_field.cached_field(self.model, self.end_node.index)
+            if field is not None:
+                grid_rect = self.renderer.surface.get_rect()
+                overlays.append((("flow", field.goal, field.version), grid_rect,
+                                 lambda: self._draw_flow_arrows(field)))
 
         # UI Text
-        algo_text = self.font_medium.render(
-            f"Algorithm: {self.algorithm_name}", True, BLACK)
-        self.win_surface.blit(algo_text, (10, 10))
+        algo_line = f"Algorithm: {self.algorithm_name}{self.solution_note}"
+        algo_text = self._render_text(self.font_medium, algo_line, BLACK)
+        algo_rect = algo_text.get_rect(topleft=(10, 10))
+        overlays.append((("algo", algo_line), algo_rect,
+                         lambda: self.win_surface.blit(algo_text, algo_rect)))
 
         status_text_content = ""
         status_color = BLACK
         if self.algorithm_running:
-            status_text_content = "Status: Running..."
+            status_text_content = f"Status: Running... ({self._speed_name()})"
             status_color = GREEN
         # Show "Stopped" only if stop was requested but popup isn't shown yet
         elif self.stop_requested and not self.show_result_popup:
             status_text_content = "Status: Stopped"
             status_color = RED
+        elif self.replay:
+            state = "playing" if self.replay_playing else "paused"
+            status_text_content = (f"Replay {self.replay.position}/{len(self.replay.trace)} "
+                                   f"x{self.replay_speed} ({state})")
+            status_color = PURPLE
 
         if status_text_content:
-            status_text = self.font_medium.render(
-                status_text_content, True, status_color)
+            status_text = self._render_text(
+                self.font_medium, status_text_content, status_color)
             status_text_rect = status_text.get_rect(
                 topright=(self.width - 10, 10))
-            self.win_surface.blit(status_text, status_text_rect)
+            overlays.append((("status", status_text_content), status_text_rect,
+                             lambda: self.win_surface.blit(status_text, status_text_rect)))
+
+        if self.show_stats and self.run_stats:
+            lines, stats_surface = self._stats_overlay()
+            stats_rect = stats_surface.get_rect(topright=(self.width - 10, 40))
+            overlays.append((("stats", lines), stats_rect,
+                             lambda: self.win_surface.blit(stats_surface, stats_rect)))
 
         if self.show_help:
-            self._draw_help_box()
+            overlays.append((("help",) + self._help_settings(),
+                             self._centered_rect(self.HELP_BOX_SIZE), self._draw_help_box))
 
         if self.input_mode_active:
-            self._draw_input_box()
+            cursor_on = time.time() % 1 < 0.5
+            overlays.append((("input", self.input_prompt, self.input_string, cursor_on),
+                             self._centered_rect(self.INPUT_BOX_SIZE), self._draw_input_box))
 
         # --- Draw Result Pop-up LAST (on top) ---
         if self.show_result_popup:
-            self._draw_result_popup()
+            overlays.append((("popup", self.result_message, self.result_details),
+                             self._centered_rect(self.POPUP_SIZE), self._draw_result_popup))
         # -----------------------------------------
+        return overlays
+
+    def _stats_overlay(self):
+        """
+        The statistics panel as (lines, surface). While a search runs it is
+        refreshed every STATS_REFRESH seconds, so rendering it does not
+        become the cost it is measuring.
+        """
+        cached_lines, surface, rendered_at = self._stats_cache
+        now = time.perf_counter()
+        if surface is not None and self.algorithm_running and now - rendered_at < self.STATS_REFRESH:
+            return cached_lines, surface
+        lines = tuple(self.run_stats.summary_lines())
+        if lines != cached_lines:
+            labels = [self.font_small.render(line, True, BLACK) for line in lines]
+            line_height = 18
+            surface = pygame.Surface((max(label.get_width() for label in labels) + 16,
+                                      line_height * len(labels) + 8), pygame.SRCALPHA)
+            surface.fill((240, 240, 240, 220))
+            pygame.draw.rect(surface, BLACK, surface.get_rect(), 1)
+            for i, label in enumerate(labels):
+                surface.blit(label, (8, 4 + line_height * i))
+        self._stats_cache = (lines, surface, now)
+        return lines, surface
 
-        pygame.display.update()  # Update the display
+    def _draw_flow_arrows(self, field):
+        """Draws an arrow in every visible cell pointing along its flow field direction."""
+        cache_key = (field.goal, field.version, self.camera.version)
+        cached_key, arrow_surface = self._arrow_cache
+        if cached_key != cache_key:
+            arrow_surface = self._make_arrow_surface(field)
+            self._arrow_cache = (cache_key, arrow_surface)
+        self.win_surface.blit(arrow_surface, (0, 0))
+
+    def _make_arrow_surface(self, field):
+        """
+        Renders the flow field arrows of the visible cells once per goal,
+        grid version and camera position. Cells too small to hold an arrow
+        get none.
+        """
+        arrow_surface = pygame.Surface(self.renderer.surface.get_size(), pygame.SRCALPHA)
+        camera = self.camera
+        size = camera.cell_size
+        if size < self.MIN_ARROW_CELL:
+            return arrow_surface
+        cols = self.model.cols
+        half = size / 2
+        length = size * 0.35
+        head = max(2, size * 0.15)
+        first_row, end_row, first_col, end_col = camera.visible()
+        for row in range(first_row, end_row):
+            bits = field.direction[row * cols + first_col:row * cols + end_col]
+            for col, bit in enumerate(bits, first_col):
+                if bit == flow_field.NO_DIRECTION:
+                    continue
+                dx, dy = LINK_DELTAS[bit]  # Screen x follows the row, as in cell_rect()
+                if dx and dy:  # Unit length on diagonals too
+                    dx, dy = dx * 0.7071, dy * 0.7071
+                left, top = camera.cell_origin(row, col)
+                center_x, center_y = left + half, top + half
+                tip = (center_x + dx * length, center_y + dy * length)
+                tail = (center_x - dx * length, center_y - dy * length)
+                pygame.draw.line(arrow_surface, GREY, tail, tip)
+                pygame.draw.polygon(arrow_surface, GREY, [
+                    tip,
+                    (tip[0] - (dx + dy) * head, tip[1] - (dy - dx) * head),
+                    (tip[0] - (dx - dy) * head, tip[1] - (dy + dx) * head)])
+        return arrow_surface
+
+    def _render_text(self, font, text, color):
+        """Renders a text label, reusing the surface if it was drawn before."""
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            surface = self._text_cache[key] = font.render(text, True, color)
+        return surface
+
+    def _centered_rect(self, size):
+        """Rect of the given size centered in the window."""
+        rect = pygame.Rect((0, 0), size)
+        rect.center = self.win_surface.get_rect().center
+        return rect
 
     def _draw_help_box(self):
         """Draws the semi-transparent help overlay."""
-        box_width = 480
-        box_height = 380
-        win_w, win_h = self.win_surface.get_size()
-        box_x = (win_w - box_width) // 2
-        box_y = (win_h - box_height) // 2
+        box_rect = self._centered_rect(self.HELP_BOX_SIZE)
+        cached_settings, help_surface = self._help_cache
+        if cached_settings != self._help_settings():
+            help_surface = self._make_help_surface(box_rect.size)
+            self._help_cache = (self._help_settings(), help_surface)
+        self.win_surface.blit(help_surface, box_rect)
 
+    def _help_settings(self):
+        """Settings shown in the help box; it is re-rendered when they change."""
+        return (self.current_max_depth_lds, self.memory_cap, self.bfs_engine, self.brush_cost,
+                self.model.connectivity, self.model.corner_cutting, self.search_speed)
+
+    def _make_help_surface(self, size):
+        """Renders the help box contents once so redraws are a single blit."""
+        box_width, box_height = size
         help_surface = pygame.Surface((box_width, box_height), pygame.SRCALPHA)
         help_surface.fill((240, 240, 240, 220))
         pygame.draw.rect(help_surface, BLACK, help_surface.get_rect(), 1)
@@ -156,19 +343,35 @@ class PathfindingVisualizer:
         help_text = [
             "Controls:",
             " LClick: Place Start(1st), End(2nd), Barriers",
-            " RClick: Erase Node",
+            " RClick: Erase Node (and its terrain)",
+            f" 0-9: Brush: 0 Barrier, 1-{MAX_COST} Terrain Cost (Cur:{self._brush_name()})",
             "--- Algorithms (Require Start & End) ---",
             " SPACE: A* Search",
+            " J: Jump Point Search (JPS)",
+            " A: Bidirectional A*",
+            " N: Bidirectional BFS",
+            " Z: Hierarchical A* (HPA*)",
+            " E: D* Lite (Incremental Replanning)",
+            " G: Flow Field (Arrows Toward End)",
             " D: Dijkstra / UCS",
-            " B: Breadth-First Search (BFS)",
+            f" B: Breadth-First Search (BFS - Engine:{self.bfs_engine})",
             " F: Depth-First Search (DFS)",
             " I: Iterative Deepening (IDS)",
             f" L: Limited Depth Search (LDS - Cur:{self.current_max_depth_lds})",
             " K: Hill Climbing (Greedy Best-First)",
+            f" Y: ARA* (Anytime, Improves for {self.ARA_DEADLINE:g}s)",
+            f" Q / Shift+Q: SMA* / Beam Search (Node Cap:{self.memory_cap})",
             "--- Control ---",
             " C: Clear All (Grid, Start, End)",
             " R: Reset Search (Keep Grid, Start, End)",
             " S: Stop Current Search",
+            f" +/-: Search Speed (Cur:{self._speed_name()})",
+            " V: Toggle BFS Engine (loop / vector)",
+            f" M: Cycle Movement (Cur:{self._movement_name()})",
+            " P: Replay Last Search (SPACE ] [ . , 0-9 Home End)",
+            f" W / O: Save / Open Map ({self.map_path})",
+            " T: Toggle Run Statistics, X: Export Them (JSON)",
+            " Wheel/Arrows/Middle-drag: Zoom & Pan, U: Fit Map",
             " F11: Toggle Fullscreen",  # Added Fullscreen toggle help
             " H: Toggle Help (This Box)",
             " ESC: Quit Program / Close Pop-up",  # Added ESC for pop-up
@@ -177,16 +380,25 @@ class PathfindingVisualizer:
         for i, line in enumerate(help_text):
             label = self.font_small.render(line, True, BLACK)
             help_surface.blit(label, (10, 5 + line_height * i))
+        return help_surface
+
+    def _movement_name(self):
+        if self.model.connectivity == 4:
+            return "4-way"
+        return f"8-way, corners:{self.model.corner_cutting}"
 
-        self.win_surface.blit(help_surface, (box_x, box_y))
+    def _brush_name(self):
+        return "Barrier" if self.brush_cost is None else str(self.brush_cost)
+
+    def _speed_name(self):
+        steps = self.SEARCH_SPEEDS[self.search_speed]
+        if steps is None:
+            return f"max, {self.SEARCH_FRAME_TIME * 1000:g} ms/frame"
+        return f"{steps} step/frame" if steps == 1 else f"{steps} steps/frame"
 
     def _draw_input_box(self):
         """Draws the input box for DLS depth."""
-        box_width = 300
-        box_height = 100
-        win_w, win_h = self.win_surface.get_size()
-        box_x = (win_w - box_width) // 2
-        box_y = (win_h - box_height) // 2
+        box_x, box_y, box_width, box_height = self._centered_rect(self.INPUT_BOX_SIZE)
 
         # Draw on the main window surface (self.win_surface)
         pygame.draw.rect(self.win_surface, LIGHT_GREY,
@@ -210,11 +422,7 @@ class PathfindingVisualizer:
 
     def _draw_result_popup(self):
         """Draws the pop-up box showing the search result."""
-        box_width = 400
-        box_height = 150
-        win_w, win_h = self.win_surface.get_size()
-        box_x = (win_w - box_width) // 2
-        box_y = (win_h - box_height) // 2
+        box_x, box_y, box_width, box_height = self._centered_rect(self.POPUP_SIZE)
 
         # Create a surface for the popup
         popup_surface = pygame.Surface((box_width, box_height))
@@ -228,6 +436,13 @@ class PathfindingVisualizer:
             center=(box_width // 2, box_height // 2 - 20))
         popup_surface.blit(message_text, message_rect)
 
+        # Render the search statistics, if any
+        if self.result_details:
+            details_text = self.font_small.render(self.result_details, True, BLACK)
+            details_rect = details_text.get_rect(
+                center=(box_width // 2, box_height // 2 + 8))
+            popup_surface.blit(details_text, details_rect)
+
         # Render dismiss instruction
         dismiss_text = self.font_small.render("Press ESC to close", True, GREY)
         dismiss_rect = dismiss_text.get_rect(
@@ -267,80 +482,200 @@ class PathfindingVisualizer:
         print("Clearing grid, start, end nodes.")
         self.start_node = None
         self.end_node = None
-        self.grid = self._make_grid()
+        self.model.clear()
         self.algorithm_name = "None"
         self.algorithm_running = False
         self.stop_requested = False
         self.show_result_popup = False  # Hide popup on clear
         self.result_message = ""
+        self.result_details = ""
+        self.show_flow_field = False
 
-    def clear_search_visualization(self, clear_only_search=False, keep_current_algo_colors=False):
+    def clear_search_visualization(self):
         """Resets node colors related to search."""
         print("Clearing search visualization...")
-        for row in self.grid:
-            for node in row:
-                is_special = node.is_start() or node.is_end() or node.is_barrier()
-                is_search_color = node.is_open() or node.is_closed(
-                ) or node.is_path() or node.is_current()
-                if is_search_color:
-                    node.reset()
-                elif clear_only_search and is_special:
-                    pass
-                elif not clear_only_search and not is_special:
-                    node.reset()
-        if keep_current_algo_colors:
-            for row in self.grid:
-                for node in row:
-                    if node.is_current():
-                        node.make_closed()
+        self.model.reset_search()
         if self.start_node:
             self.start_node.make_start()
         if self.end_node:
             self.end_node.make_end()
         self.algorithm_name = "None"  # Reset algo name only if clearing search
+        self.solution_note = ""
         self.algorithm_running = False
         # Do not reset stop_requested or popup flags here
 
-    def start_algorithm(self, algo_func_name, display_name, *args):
-        """Prepares and runs the selected pathfinding algorithm."""
+    def start_algorithm(self, algo_func_name, display_name, *args, **params):
+        """
+        Prepares the selected pathfinding algorithm; main_loop then runs it
+        a frame's budget at a time. A cached result is shown at once.
+        """
         if not self.start_node or not self.end_node:
             print("Error: Please place both Start and End nodes first.")
             return
-        try:
-            algo_func = getattr(algorithms, algo_func_name)
-        except AttributeError:
+        if algo_func_name not in solver.ALGORITHMS:
             print(f"Error: Algorithm function '{algo_func_name}' not found.")
             return
 
-        self.clear_search_visualization(clear_only_search=True)
+        self.clear_search_visualization()
         self.show_result_popup = False  # Ensure no old popup lingers
-        for row in self.grid:
-            for node in row:
-                node.update_neighbors(self.grid)
 
         self.algorithm_name = display_name
+        self.show_flow_field = algo_func_name == 'flow_field'
         print(f"Starting {self.algorithm_name}...")
         self.algorithm_running = True
         self.stop_requested = False
-        found = algo_func(self, self.grid, self.start_node,
-                          self.end_node, *args)
+        stats = self.run_stats = instrumentation.RunStats(
+            algo_func_name, self.model, self.start_node.index, self.end_node.index)
+        started = time.perf_counter()
+        cache_key = PathCache.key(algo_func_name, self.model, self.start_node.index,
+                                  self.end_node.index, args, params)
+        result = None if cache_key is None else self.path_cache.get(cache_key)
+        cached = result is not None
+        if cached:
+            # Same search on an unchanged grid: show the stored path at once,
+            # and record it so replay (P) shows this run, not the one before
+            stats.cached = True
+            with search_trace.TraceWriter(self.TRACE_PATH, self.model, self.start_node.index,
+                                          self.end_node.index) as writer:
+                for cell in result.path[1:-1]:
+                    self._apply_event(EVENT_PATH, cell)
+                    writer.record(EVENT_PATH, cell)
+            stats.events[EVENT_PATH] = len(result.path[1:-1])
+            stats.add('apply', time.perf_counter() - started)
+            self._report_result(result, cached=True)
+            return
+        writer = search_trace.TraceWriter(self.TRACE_PATH, self.model, self.start_node.index,
+                                          self.end_node.index)
+        events = solver.search(algo_func_name, self.model, self.start_node.index,
+                               self.end_node.index, *args, **params)
+        self._search = (events, writer, cache_key, started)
+
+    def stop_search(self):
+        """Abandons the running search at once (S)."""
+        print("Stop request received!")
+        self.stop_requested = True
+        self._end_search(None)
+
+    def _end_search(self, result):
+        """Closes the running search and its trace, and reports 'result' (None if stopped)."""
+        events, writer, cache_key, started = self._search
+        self._search = None
+        events.close()
+        writer.close()
+        if result is not None:
+            result.elapsed = time.perf_counter() - started
+            if cache_key is not None:  # Time-bounded results are not cached
+                self.path_cache.put(cache_key, result)
+        self._report_result(result)
+
+    def _report_result(self, result, cached=False):
+        """Ends the run's statistics and shows its outcome in the pop-up."""
+        stats = self.run_stats
+        stats.finish(result)
         self.algorithm_running = False
+        print("Time: " + ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in stats.times.items())
+              + f" ({stats.frames} frames)")
 
         # --- Set Result Message and Show Pop-up ---
         if self.stop_requested:
             print(f"{self.algorithm_name} Stopped.")
             self.result_message = "Search Stopped!"
-            self.clear_search_visualization(
-                clear_only_search=True, keep_current_algo_colors=True)
-        elif found:
-            print(f"{self.algorithm_name} Finished: Path found.")
-            self.result_message = "Path Found!"
+            self.result_details = ""
+            self.clear_search_visualization()
         else:
-            print(f"{self.algorithm_name} Finished: Path not found.")
-            self.result_message = "Path Not Found"
+            if cached:
+                print(f"Replayed cached result ({self.path_cache.hits} cache hits so far).")
+            if result.message:
+                print(result.message)
+            if result.found:
+                print(f"{self.algorithm_name} Finished: Path found "
+                      f"(cost {result.cost:.6g}, {result.steps} steps, {result.expansions} expansions, "
+                      f"{result.elapsed:.2f}s).")
+                self.result_message = "Path Found!"
+                if result.cost == result.steps:
+                    self.result_details = f"Length {result.cost}, {result.expansions} expanded"
+                else:
+                    self.result_details = (f"Cost {result.cost:.6g} ({result.steps} steps), "
+                                           f"{result.expansions} expanded")
+                if result.bound is not None and result.bound > 1:
+                    self.result_details += f", within {result.bound:.3g}x"
+                if result.pruned:
+                    self.result_details += f", {result.pruned} pruned"
+            else:
+                print(f"{self.algorithm_name} Finished: Path not found "
+                      f"({result.expansions} expansions).")
+                self.result_message = "Path Not Found"
+                self.result_details = f"{result.expansions} expanded"
+                if result.pruned:
+                    self.result_details += f", {result.pruned} pruned"
+            if cached:
+                self.result_details += " (cached)"
+            self.start_node.make_start()
+            self.end_node.make_end()
         self.show_result_popup = True
         # -----------------------------------------
 
+    def _advance_search(self):
+        """
+        Runs the search for one frame: pulls events from its generator,
+        painting each onto the grid and into the trace, until the speed's
+        step count (expansions, not pushes) or SEARCH_FRAME_TIME is used
+        up. main_loop draws the frame afterwards, so the search runs at its
+        own pace rather than one redraw per expansion.
+        """
+        events, writer = self._search[:2]
+        record = writer.record
+        stats = self.run_stats
+        times, counts = stats.times, stats.events
+        clock = time.perf_counter
+        steps = self.SEARCH_SPEEDS[self.search_speed]
+        deadline = clock() + self.SEARCH_FRAME_TIME
+        while True:
+            searched = clock()
+            try:
+                event, cell = next(events)
+            except StopIteration as done:
+                times['search'] += clock() - searched
+                self._end_search(done.value)
+                return
+            applied = clock()
+            times['search'] += applied - searched
+            record(event, cell)
+            self._apply_event(event, cell)
+            counts[event] += 1
+            finished = clock()
+            times['apply'] += finished - applied
+            if event != EVENT_OPEN and event != EVENT_OPEN_REVERSE:
+                if finished >= deadline:
+                    return
+                if steps is not None:
+                    steps -= 1
+                    if steps == 0:
+                        return
+
+    def change_search_speed(self, change):
+        """Moves 'change' places along SEARCH_SPEEDS (+/-)."""
+        self.search_speed = max(0, min(len(self.SEARCH_SPEEDS) - 1, self.search_speed + change))
+        print(f"Search speed: {self._speed_name()}")
+
+    def _apply_event(self, event, cell):
+        """Mirrors a single search event onto the grid model."""
+        if event == EVENT_RESET:
+            self.model.reset_search()
+            return
+        if event == EVENT_CLOSED_LAYER:
+            for index in cell:
+                self._apply_event(EVENT_CLOSED, index)
+            return
+        if event == EVENT_SOLUTION:
+            self.solution_note = f" - cost {cell.cost:.6g}, within {cell.bound:.3g}x"
+            print(f"{self.algorithm_name}: path of cost {cell.cost:.6g} "
+                  f"({cell.expansions} expansions), within {cell.bound:.3g}x optimal")
+            return
+        if cell == self.start_node.index or cell == self.end_node.index:
+            return
+        self.model.set_state(cell, EVENT_STATES[event])
+
     def start_lds_with_input(self, depth):
         """Callback function called after user enters depth for LDS."""
         if depth > 0:
@@ -351,12 +686,176 @@ class PathfindingVisualizer:
         else:
             print("Invalid depth entered for LDS (must be > 0).")
 
-    def check_for_quit(self):
-        """Helper method called by algorithms to allow quitting."""
-        for event in pygame.event.get(eventtype=pygame.QUIT):
-            print("Quit event detected during algorithm execution.")
-            self.stop_requested = True
-            self.run_flag = False
+    def start_memory_bounded_with_input(self, algo_func_name, display_name):
+        """Returns the input callback that runs a memory-bounded search with the entered node cap."""
+        def start(cap):
+            if cap >= 2:
+                self.memory_cap = cap
+                params = {'max_nodes': cap}
+                if algo_func_name == 'beam_search':
+                    # The beam itself must fit under the cap
+                    params['beam_width'] = min(memory_bounded.DEFAULT_BEAM_WIDTH, cap)
+                self.start_algorithm(algo_func_name, f"{display_name} (Cap {cap} Nodes)", **params)
+            else:
+                print(f"Invalid node cap entered for {display_name} (must be >= 2).")
+        return start
+
+    # --- Camera ---
+    def _handle_camera_event(self, event):
+        """Zooms on the mouse wheel and pans on arrow keys or a middle-button drag."""
+        camera = self.camera
+        if event.type == pygame.MOUSEWHEEL:
+            camera.zoom(event.y, pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEMOTION and event.buttons[1]:
+            camera.pan(-event.rel[0], -event.rel[1])
+        elif event.type == pygame.KEYDOWN and event.key in self._PAN_KEYS:
+            dx, dy = self._PAN_KEYS[event.key]
+            camera.pan(dx * self.width // self.PAN_FRACTION, dy * self.height // self.PAN_FRACTION)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_u:
+            camera.fit()
+        else:
+            return False
+        return True
+
+    # --- Run Statistics ---
+    def toggle_stats(self):
+        self.show_stats = not self.show_stats
+        if self.show_stats and self.run_stats is None:
+            print("No run statistics yet; they appear after the next search.")
+
+    def export_stats(self):
+        """Writes the latest run's statistics to a timestamped JSON file."""
+        stats = self.run_stats
+        if stats is None or stats.result is None and not stats.stopped:
+            print("No finished run to export.")
+            return
+        path = f"run-{stats.algorithm}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        try:
+            stats.export(path)
+        except OSError as error:
+            print(f"Could not export run statistics: {error}")
+            return
+        print(f"Exported run statistics to {path}.")
+
+    # --- Maps ---
+    def save_map(self):
+        """Writes the grid, terrain, movement rules and Start/End to map_path."""
+        start = self.start_node.index if self.start_node else None
+        end = self.end_node.index if self.end_node else None
+        try:
+            map_io.save(self.map_path, self.model, start, end)
+        except OSError as error:
+            print(f"Could not save the map: {error}")
+            return
+        print(f"Saved the map to {self.map_path}.")
+
+    def open_map(self, path=None):
+        """
+        Replaces the grid with a saved grid (.pfmap) or a Moving AI map
+        (.map), which may have a different size.
+        """
+        path = path or self.map_path
+        try:
+            if path.endswith(".map"):
+                model, start, end = map_io.read_movingai_map(path), None, None
+            else:
+                model, start, end = map_io.load(path)
+        except (OSError, ValueError) as error:
+            print(f"Could not open {path}: {error}")
+            return
+        if self.replay:
+            self.toggle_replay()
+        self.model = model
+        self.rows, self.cols = model.rows, model.cols
+        self.camera = Camera(model.rows, model.cols, self.width, self.height)
+        self.renderer = GridRenderer(model, self.camera)
+        self.path_cache = PathCache()  # Versions of the old grid mean nothing here
+        self.start_node = None if start is None else self._node(*model.pos(start))
+        self.end_node = None if end is None else self._node(*model.pos(end))
+        self.algorithm_name = "None"
+        self.show_result_popup = False
+        self.show_flow_field = False
+        self._overlay_keys = None
+        if not path.endswith(".map"):
+            self.map_path = path  # W saves back to the file that was opened
+        print(f"Opened {path} ({model.rows}x{model.cols}, {self._movement_name()}).")
+
+    # --- Replay ---
+    def toggle_replay(self):
+        """
+        Enters replay mode on the last recorded search, or leaves it with
+        the board as shown. The trace is read through mmap, so large runs
+        replay without the algorithm and without loading every event.
+        """
+        if self.replay:
+            self.replay.trace.close()
+            self.replay = None
+            self.replay_playing = False
+            print("Replay off.")
+            return
+        try:
+            trace = search_trace.SearchTrace(self.TRACE_PATH)
+        except (OSError, ValueError) as error:
+            print(f"Nothing to replay: {error}")
+            return
+        try:
+            self.replay = search_trace.TraceReplayer(trace, self.model)
+        except ValueError as error:
+            trace.close()
+            print(f"Cannot replay: {error}")
+            return
+        # The trace's board replaces the current one, Start and End included
+        self.start_node = self._node(*self.model.pos(trace.start))
+        self.end_node = self._node(*self.model.pos(trace.end))
+        self.show_result_popup = False
+        self.show_flow_field = False
+        self.replay_playing = True
+        print(f"Replaying {len(trace)} events from {self.TRACE_PATH}.")
+
+    def _handle_replay_key(self, key):
+        """Replay controls: play/pause, speed, single steps and seeking."""
+        replay = self.replay
+        if key == pygame.K_SPACE:
+            self.replay_playing = not self.replay_playing
+            if self.replay_playing and replay.at_end():
+                replay.seek(0)
+        elif key == pygame.K_RIGHTBRACKET:
+            self.replay_speed = min(self.replay_speed * 2, self.MAX_REPLAY_SPEED)
+        elif key == pygame.K_LEFTBRACKET:
+            self.replay_speed = max(self.replay_speed // 2, 1)
+        elif key == pygame.K_PERIOD:
+            self.replay_playing = False
+            replay.step(1)
+        elif key == pygame.K_COMMA:
+            self.replay_playing = False
+            replay.step(-1)
+        elif pygame.K_0 <= key <= pygame.K_9:
+            replay.seek(len(replay.trace) * (key - pygame.K_0) // 10)
+        elif key == pygame.K_HOME:
+            replay.seek(0)
+        elif key == pygame.K_END:
+            replay.seek(len(replay.trace))
+
+    def cycle_movement(self):
+        """Steps through 4-way, then 8-way under each corner-cutting policy."""
+        if self.model.connectivity == 4:
+            connectivity, corner_cutting = 8, CORNER_CUTTING[0]
+        elif self.model.corner_cutting != CORNER_CUTTING[-1]:
+            connectivity = 8
+            corner_cutting = CORNER_CUTTING[CORNER_CUTTING.index(self.model.corner_cutting) + 1]
+        else:
+            connectivity, corner_cutting = 4, CORNER_CUTTING[0]
+        self.clear_search_visualization()
+        self.model.set_connectivity(connectivity, corner_cutting)
+        print(f"Movement: {self._movement_name()} (heuristic: {heuristics.default_name(self.model)})")
+
+    def toggle_bfs_engine(self):
+        """Switches bfs between the per-cell loop and the NumPy wavefront."""
+        if self.bfs_engine == 'loop' and not wavefront.AVAILABLE:
+            print("The vector BFS engine needs NumPy; staying on the loop engine.")
+            return
+        self.bfs_engine = 'vector' if self.bfs_engine == 'loop' else 'loop'
+        print(f"BFS engine: {self.bfs_engine}")
 
     def toggle_fullscreen(self):
         """Toggles the display between windowed and fullscreen mode."""
@@ -378,6 +877,7 @@ class PathfindingVisualizer:
             # self.width, self.height = self.win_surface.get_size() # Update internal size if using (0,0)
             # self.gap = self.width // self.rows # Recalculate gap if size changes
             self.is_fullscreen = True
+        self._overlay_keys = None  # New display surface needs a full frame
         # Optional: Redraw immediately after mode switch
         self.draw()
 
@@ -386,6 +886,7 @@ class PathfindingVisualizer:
         clock = pygame.time.Clock()
 
         while self.run_flag:
+            polled = time.perf_counter()
             # --- Event Handling ---
             for event in pygame.event.get():
                 # --- Always Handle Quit ---
@@ -393,12 +894,17 @@ class PathfindingVisualizer:
                     self.run_flag = False
                     break  # Exit event loop immediately
 
+                # --- Zoom and Pan (always available) ---
+                if self._handle_camera_event(event):
+                    continue
+
                 # --- Handle Pop-up Dismissal ---
                 if self.show_result_popup:
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_ESCAPE:
                             self.show_result_popup = False
                             self.result_message = ""
+                            self.result_details = ""
                             self.stop_requested = False  # Allow new actions after closing popup
                             print("Result pop-up closed.")
                     # Ignore other events while pop-up is shown
@@ -409,29 +915,49 @@ class PathfindingVisualizer:
                     self._handle_input(event)
                     continue  # Skip other events during input
 
+                # --- Handle Replay Mode (no editing or searching meanwhile) ---
+                if self.replay:
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE or event.key == pygame.K_p:
+                            self.toggle_replay()
+                        elif event.key == pygame.K_h:
+                            self.show_help = not self.show_help
+                        elif event.key == pygame.K_F11:
+                            self.toggle_fullscreen()
+                        else:
+                            self._handle_replay_key(event.key)
+                    continue
+
                 # --- Handle Mouse Input (only if not running/stopped/popup) ---
                 if not self.algorithm_running and not self.stop_requested:
                     if pygame.mouse.get_pressed()[0]:  # Left Click
-                        pos = pygame.mouse.get_pos()
-                        row, col = self._get_clicked_pos(pos)
-                        node = self.grid[row][col]
-                        if not self.start_node and node != self.end_node:
+                        cell = self._get_clicked_pos(pygame.mouse.get_pos())
+                        node = None if cell is None else self._node(*cell)
+                        if node is None:
+                            pass  # Off the grid
+                        elif not self.start_node and node != self.end_node:
                             self.start_node = node
                             self.start_node.make_start()
                         elif not self.end_node and node != self.start_node:
                             self.end_node = node
                             self.end_node.make_end()
                         elif node != self.start_node and node != self.end_node:
-                            node.make_barrier()
+                            if self.brush_cost is None:
+                                node.make_barrier()
+                            else:
+                                if node.is_barrier():
+                                    node.reset()
+                                self.model.set_cost(node.index, self.brush_cost)
                     elif pygame.mouse.get_pressed()[2]:  # Right Click
-                        pos = pygame.mouse.get_pos()
-                        row, col = self._get_clicked_pos(pos)
-                        node = self.grid[row][col]
-                        if node == self.start_node:
-                            self.start_node = None
-                        elif node == self.end_node:
-                            self.end_node = None
-                        node.reset()
+                        cell = self._get_clicked_pos(pygame.mouse.get_pos())
+                        if cell is not None:
+                            node = self._node(*cell)
+                            if node == self.start_node:
+                                self.start_node = None
+                            elif node == self.end_node:
+                                self.end_node = None
+                            node.reset()
+                            self.model.set_cost(node.index, DEFAULT_COST)
 
                 # --- Handle Keyboard Input ---
                 if event.type == pygame.KEYDOWN:
@@ -443,26 +969,67 @@ class PathfindingVisualizer:
                         self.show_help = not self.show_help
                     if event.key == pygame.K_F11:
                         self.toggle_fullscreen()  # Toggle fullscreen
+                    if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                        self.change_search_speed(1)
+                    if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        self.change_search_speed(-1)
 
                     # --- Keys active only when NOT running ---
                     if not self.algorithm_running:
                         if event.key == pygame.K_c:
                             self.clear_all()
                         if event.key == pygame.K_r:
-                            self.clear_search_visualization(
-                                clear_only_search=True)
+                            self.clear_search_visualization()
                             self.stop_requested = False  # Allow new search
+                        if event.key == pygame.K_v:
+                            self.toggle_bfs_engine()
+                        if event.key == pygame.K_m:
+                            self.cycle_movement()
+                        if event.key == pygame.K_p:
+                            self.toggle_replay()
+                            continue
+                        if event.key == pygame.K_w:
+                            self.save_map()
+                        if event.key == pygame.K_t:
+                            self.toggle_stats()
+                        if event.key == pygame.K_x:
+                            self.export_stats()
+                        if event.key == pygame.K_o:
+                            self.open_map()
+                        if pygame.K_0 <= event.key <= pygame.K_9:
+                            cost = event.key - pygame.K_0
+                            self.brush_cost = None if cost == 0 else cost
+                            print(f"Brush: {self._brush_name()}")
 
                         # Start Algorithms
                         if self.start_node and self.end_node:
                             if event.key == pygame.K_SPACE:
                                 self.start_algorithm('a_star', "A* Search")
+                            elif event.key == pygame.K_j:
+                                self.start_algorithm(
+                                    'jps', "Jump Point Search (JPS)")
+                            elif event.key == pygame.K_a:
+                                self.start_algorithm(
+                                    'bidirectional_a_star', "Bidirectional A*")
+                            elif event.key == pygame.K_n:
+                                self.start_algorithm(
+                                    'bidirectional_bfs', "Bidirectional BFS")
+                            elif event.key == pygame.K_z:
+                                self.start_algorithm(
+                                    'hpa_star', "Hierarchical A* (HPA*)")
+                            elif event.key == pygame.K_e:
+                                self.start_algorithm(
+                                    'd_star_lite', "D* Lite")
+                            elif event.key == pygame.K_g:
+                                self.start_algorithm(
+                                    'flow_field', "Flow Field")
                             elif event.key == pygame.K_d:
                                 self.start_algorithm(
                                     'dijkstra', "Dijkstra / UCS")
                             elif event.key == pygame.K_b:
                                 self.start_algorithm(
-                                    'bfs', "Breadth-First Search (BFS)")
+                                    'bfs', f"Breadth-First Search (BFS, {self.bfs_engine})",
+                                    engine=self.bfs_engine)
                             elif event.key == pygame.K_f:
                                 self.start_algorithm(
                                     'dfs', "Depth-First Search (DFS)")
@@ -472,6 +1039,20 @@ class PathfindingVisualizer:
                             elif event.key == pygame.K_k:
                                 self.start_algorithm(
                                     'hill_climbing', "Hill Climbing")
+                            elif event.key == pygame.K_y:
+                                self.start_algorithm(
+                                    'ara_star', "ARA*", deadline=self.ARA_DEADLINE)
+                            elif event.key == pygame.K_q:
+                                if event.mod & pygame.KMOD_SHIFT:
+                                    algo_func_name, display_name = 'beam_search', "Beam Search"
+                                else:
+                                    algo_func_name, display_name = 'sma_star', "SMA*"
+                                self.input_prompt = f"Enter {display_name} Node Cap:"
+                                self.input_target_func = self.start_memory_bounded_with_input(
+                                    algo_func_name, display_name)
+                                self.input_mode_active = True
+                                self.input_string = str(self.memory_cap)
+                                print(f"Input requested for {display_name} node cap (current: {self.memory_cap}).")
                             elif event.key == pygame.K_l:
                                 self.input_prompt = "Enter LDS Depth Limit:"
                                 self.input_target_func = self.start_lds_with_input
@@ -483,15 +1064,31 @@ class PathfindingVisualizer:
 
                     # --- Stop Algorithm (only if running) ---
                     if self.algorithm_running and event.key == pygame.K_s:
-                        print("Stop request received!")
-                        self.stop_requested = True
+                        self.stop_search()
 
             # Check run flag again before drawing, in case Quit was handled
             if not self.run_flag:
+                if self._search:
+                    self.stop_search()
                 break
 
+            # --- Advance Search ---
+            if self._search:
+                self.run_stats.add('poll', time.perf_counter() - polled)
+                self._advance_search()
+
+            # --- Advance Replay ---
+            if self.replay and self.replay_playing:
+                self.replay.step(self.replay_speed)
+                if self.replay.at_end():
+                    self.replay_playing = False
+
             # --- Update Display ---
+            rendered = time.perf_counter()
             self.draw()
+            if self._search:
+                self.run_stats.add('render', time.perf_counter() - rendered)
+                self.run_stats.frames += 1
 
             # --- Frame Rate Control ---
             clock.tick(60)
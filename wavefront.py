@@ -0,0 +1,118 @@
+"""
+Vectorized wavefront BFS for unit-cost grids (NumPy backend for bfs).
+
+Instead of popping one cell at a time, each BFS layer is expanded at once:
+the frontier is an index array, and the GridModel's link bits give every
+walkable move of every frontier cell in one mask-and-shift per direction.
+The result is a full int32 distance field (UNSEEN where unreachable), and
+a shortest path is read off it by descending the gradient from the goal.
+
+NumPy is optional; AVAILABLE tells whether this backend can be used.
+"""
+from constants import *
+from algorithms import SearchResult, emit_path, path_cost, UNSEEN
+
+try:
+    import numpy as np
+except ImportError:  # Only the vector engine needs NumPy
+    np = None
+
+AVAILABLE = np is not None
+# Layers this small (maze corridors) are cheaper to expand cell by cell
+# than to pay the fixed cost of a dozen array operations.
+THIN_LAYER = 24
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("The vector BFS engine needs NumPy (pip install numpy)")
+
+
+def layers(grid, source, goal=None, distance=None):
+    """
+    Generator over BFS layers from 'source'. Yields each layer as an array of
+    cell indices while filling 'distance' (an int32 array, created if None).
+    Stops after the layer that reaches 'goal', if one is given.
+    """
+    _require_numpy()
+    if distance is None:
+        distance = np.full(grid.size, UNSEEN, dtype=np.int32)
+    links = np.frombuffer(grid.links, dtype=np.uint8)
+    directions = [(np.uint8(bit), offset) for bit, offset in grid.link_offsets.items()]
+    slot = np.empty(grid.size, dtype=np.intp)  # Scratch space for de-duplication
+    distance_view = memoryview(distance)  # Fast scalar access for thin layers
+
+    frontier = np.array([source], dtype=np.intp)
+    distance[source] = 0
+    depth = 0
+    yield frontier
+    while frontier.size and (goal is None or distance_view[goal] == UNSEEN):
+        depth += 1
+        if frontier.size <= THIN_LAYER:
+            next_frontier = []
+            for cell in frontier.tolist():
+                for neighbor in grid.neighbors(cell):
+                    if distance_view[neighbor] == UNSEEN:
+                        distance_view[neighbor] = depth
+                        next_frontier.append(neighbor)
+            frontier = np.array(next_frontier, dtype=np.intp)
+            yield frontier
+            continue
+        frontier_links = links[frontier]
+        candidates = np.concatenate([frontier[(frontier_links & bit) != 0] + offset
+                                     for bit, offset in directions])
+        candidates = candidates[distance[candidates] == UNSEEN]
+        # Drop duplicates without sorting: the last write to each slot wins
+        order = np.arange(candidates.size)
+        slot[candidates] = order
+        frontier = candidates[slot[candidates] == order]
+        distance[frontier] = depth
+        yield frontier
+
+
+def distance_field(grid, source, goal=None):
+    """Int32 BFS distances from 'source' to every cell (UNSEEN if unreachable)."""
+    _require_numpy()
+    distance = np.full(grid.size, UNSEEN, dtype=np.int32)
+    for _ in layers(grid, source, goal, distance):
+        pass
+    return distance
+
+
+def descend(grid, distance, source, goal):
+    """Shortest path source -> goal, following the distance field downhill from the goal."""
+    path = [goal]
+    cell = goal
+    while cell != source:
+        step = distance[cell] - 1
+        for neighbor in grid.neighbors(cell):
+            if distance[neighbor] == step:
+                cell = neighbor
+                break
+        path.append(cell)
+    path.reverse()
+    return path
+
+
+def bfs_vector(grid, start, end):
+    """
+    bfs() with engine='vector'. Each layer is reported as one
+    EVENT_CLOSED_LAYER event rather than an event per cell.
+    """
+    _require_numpy()
+    expansions = 0
+    peak_open = 0
+    distance = np.full(grid.size, UNSEEN, dtype=np.int32)
+    for layer in layers(grid, start, end, distance):
+        if layer.size > peak_open:
+            peak_open = layer.size
+        expansions += layer.size
+        yield EVENT_CLOSED_LAYER, layer.tolist()
+
+    if distance[end] == UNSEEN:
+        return SearchResult(False, expansions=expansions, peak_open=peak_open, pushes=expansions)
+    path = descend(grid, distance, start, end)
+    yield from emit_path(path)
+    # Every cell of every layer was queued exactly once
+    return SearchResult(True, path, expansions, peak_open=peak_open, cost=path_cost(grid, path),
+                        pushes=expansions)